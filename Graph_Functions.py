@@ -1,153 +1,779 @@
 
-from operator import itemgetter
+import os
+import time
+from collections import deque
+import struct
+from array import array
+from bisect import insort
+import multiprocessing
+from multiprocessing import shared_memory
 from bitarray import bitarray
+import heapq
 import numpy as np
-from heapdict import heapdict
+from heapdict import indexedheap
 
-def read_graph(path, g_type, weight=False, directed=False):
+
+class CSR:
+    """
+    Representação de um grafo no formato CSR (compressed sparse row), em que as
+    adjacências de todos os vértices ficam guardadas em arrays contíguos do NumPy
+    ------------------------------------------------------------------------------
+    ATRIBUTOS:
+        - indptr (np.ndarray): os vizinhos do vértice v (1..n) estão nas posições
+        indptr[v-1]:indptr[v] de indices
+        - indices (np.ndarray): vizinhos de cada vértice (indexados a partir de 0),
+        em ordem crescente
+        - weights (np.ndarray ou None): peso de cada aresta guardada em indices
+        - directed (boolean): indica se o grafo é direcionado ou não
+    """
+    def __init__(self, indptr, indices, weights=None, directed=False):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+
+class Graph:
+    """
+    Envolve qualquer uma das representações do grafo (matriz de adjacência, lista
+    de adjacência ou CSR) e guarda os resultados derivados já calculados (graus,
+    número de arestas, vizinhos ordenados, componentes conexas, excentricidades),
+    que são descartados sempre que uma aresta é adicionada ou removida. A exceção
+    é a estrutura union-find das componentes conexas, que é atualizada quando uma
+    aresta é adicionada e só é descartada quando uma aresta é removida. Todas as
+    funções deste módulo aceitam um Graph no lugar da representação
+    ------------------------------------------------------------------------------
+    ATRIBUTOS:
+        - g (lista, dicionário, np.matrix ou CSR): representação do grafo
+        - directed (boolean): indica se o grafo é direcionado ou não
+    """
+    def __init__(self, g, directed=False):
+        self.g = g
+        self.directed = g.directed if isinstance(g, CSR) else directed
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.g)
+
+    def invalidate(self):
+        """
+        Descarta todos os resultados guardados
+        """
+        self._cache.clear()
+        # Resultados guardados diretamente na representação (CSR)
+        if getattr(self.g, '_cache', None):
+            self.g._cache.clear()
+
+    def add_edge(self, u, v, w=None):
+        """
+        Adiciona a aresta u-v (com peso w, em grafos com pesos). Caso a aresta já
+        exista, apenas o seu peso é atualizado
+        """
+        self._set_edge(u, v, w)
+        if not self.directed and u != v:
+            self._set_edge(v, u, w)
+
+        # Adicionar uma aresta apenas une duas componentes: a estrutura union-find
+        # guardada continua válida após a união de u e v
+        uf = self._cache.get('union_find')
+        self.invalidate()
+        if uf is not None and max(u, v) <= len(uf):
+            uf.union(u, v)
+            self._cache['union_find'] = uf
+
+    def remove_edge(self, u, v):
+        """
+        Remove a aresta u-v, caso ela exista
+        """
+        self._del_edge(u, v)
+        if not self.directed and u != v:
+            self._del_edge(v, u)
+        self.invalidate()
+
+    def _set_edge(self, u, v, w):
+        g = self.g
+        if isinstance(g, list):
+            g[u-1][v-1] = 1
+        elif isinstance(g, dict) and not _is_ordered(g):
+            nbrs = g.setdefault(u, set())
+            if w is None:
+                nbrs.add(v)
+            else:
+                nbrs.difference_update([x for x in nbrs if x[0] == v])
+                nbrs.add((v, w))
+        elif isinstance(g, dict):
+            # Lista ordenada: inserimos v mantendo a ordem crescente
+            nbrs = g.setdefault(u, array('i') if w is None else [])
+            if w is None:
+                if v not in nbrs:
+                    insort(nbrs, v)
+            else:
+                nbrs[:] = [x for x in nbrs if x[0] != v]
+                insort(nbrs, (v, w))
+        elif isinstance(g, CSR):
+            # Inserimos v na posição que mantém os vizinhos de u em ordem crescente
+            a, b = g.indptr[u-1], g.indptr[u]
+            i = a + np.searchsorted(g.indices[a:b], v-1)
+            if i < b and g.indices[i] == v-1:
+                if g.weights is not None:
+                    g.weights = np.array(g.weights)
+                    g.weights[i] = w
+                return
+            g.indices = np.insert(g.indices, i, v-1)
+            if g.weights is not None:
+                g.weights = np.insert(g.weights, i, w)
+            g.indptr = np.array(g.indptr)
+            g.indptr[u:] += 1
+        else:
+            g[u-1, v-1] = w
+
+    def _del_edge(self, u, v):
+        g = self.g
+        if isinstance(g, list):
+            g[u-1][v-1] = 0
+        elif isinstance(g, dict):
+            nbrs = g.get(u, set())
+            keep = [x for x in nbrs if x != v and not (isinstance(x, tuple) and x[0] == v)]
+            if isinstance(nbrs, set):
+                nbrs.intersection_update(keep)
+            else:
+                nbrs[:] = type(nbrs)('i', keep) if isinstance(nbrs, array) else keep
+        elif isinstance(g, CSR):
+            a, b = g.indptr[u-1], g.indptr[u]
+            i = a + np.searchsorted(g.indices[a:b], v-1)
+            if i == b or g.indices[i] != v-1:
+                return
+            g.indices = np.delete(g.indices, i)
+            if g.weights is not None:
+                g.weights = np.delete(g.weights, i)
+            g.indptr = np.array(g.indptr)
+            g.indptr[u:] -= 1
+        else:
+            g[u-1, v-1] = float('inf')
+
+
+
+def _unwrap(g):
+    """
+    Retorna a representação do grafo guardada em um Graph (ou o próprio g)
+    """
+    return g.g if isinstance(g, Graph) else g
+
+
+
+def _is_directed(g, directed=None):
+    """
+    Indica se o grafo é direcionado: o valor de directed, quando dado, ou o
+    atributo directed de um CSR ou Graph. A matriz de bitarray é sempre não
+    direcionada. Retorna None quando não há como saber (dicionário ou matriz com
+    pesos fora de um Graph)
+    """
+    if directed is not None:
+        return bool(directed)
+    if isinstance(g, (Graph, CSR)):
+        return g.directed
+    if isinstance(g, list) and (not g or isinstance(g[0], bitarray)):
+        return False
+    return None
+
+
+
+def _sort_edges(key, w=None):
+    """
+    Ordena as chaves inteiras das arestas (origem * n + destino) e remove as
+    arestas repetidas. Entre arestas paralelas com pesos diferentes é mantida a
+    ordem original, guardando a última ocorrência de cada par (aresta, peso)
+    """
+    if w is None:
+        key = np.sort(key)
+        keep = np.ones(len(key), dtype=bool)
+        keep[1:] = key[1:] != key[:-1]
+        return key[keep], None
+
+    # Ordenando também pelo peso para encontrar as arestas repetidas
+    order = np.argsort(w, kind='stable')
+    order = order[np.argsort(key[order], kind='stable')]
+    keep = np.ones(len(order), dtype=bool)
+    keep[:-1] = (key[order[:-1]] != key[order[1:]]) | (w[order[:-1]] != w[order[1:]])
+    order = np.sort(order[keep])
+    order = order[np.argsort(key[order], kind='stable')]
+    return key[order], w[order]
+
+
+
+def _build_csr(n, src, dst, w=None, directed=False):
+    """
+    Constrói a representação CSR a partir das colunas de arestas (vértices
+    indexados a partir de 0). Arestas repetidas são guardadas apenas uma vez, assim
+    como acontece com os conjuntos da lista de adjacência
+    """
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    if w is not None:
+        w = np.asarray(w, dtype=np.float64)
+
+    # Em grafos não direcionados cada aresta é guardada nos dois sentidos, logo
+    # após a aresta original
+    if not directed:
+        src, dst = np.column_stack((src, dst)).ravel(), np.column_stack((dst, src)).ravel()
+        if w is not None:
+            w = np.repeat(w, 2)
+
+    # Ordenando as arestas pela origem e, em seguida, pelo destino, usando uma
+    # única chave inteira por aresta
+    key, w = _sort_edges(src * n + dst, w)
+    src, dst = key // n, key % n
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+    return CSR(indptr, dst.astype(np.int32), w, directed)
+
+
+
+def _read_edges(path, weight=False):
+    """
+    Lê de uma só vez o arquivo texto do grafo (n na primeira linha e uma aresta
+    'u v [w]' por linha) em colunas tipadas do NumPy, sem criar objetos Python por
+    aresta. Retorna n e as colunas de origem, destino (indexados a partir de 0) e
+    peso (ou None caso o arquivo não tenha pesos). Com weight, um arquivo sem
+    arestas retorna uma coluna de pesos vazia
+    """
+    with open(path, 'r') as f:
+        n = int(f.readline())
+        cols = len(f.readline().split()) # Número de colunas de cada aresta
+
+    if cols == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return n, empty, empty, np.zeros(0, dtype=np.float64) if weight else None
+
+    data = np.loadtxt(path, dtype=np.float64 if cols > 2 else np.int64, skiprows=1,
+                      usecols=range(cols), ndmin=2)
+    src = data[:, 0].astype(np.int64) - 1
+    dst = data[:, 1].astype(np.int64) - 1
+    w = data[:, 2].copy() if cols > 2 else None
+    return n, src, dst, w
+
+
+
+def _iter_edges(path, chunk_size):
+    """
+    Lê o arquivo texto do grafo em blocos de no máximo chunk_size bytes (mais o
+    final da linha interrompida), retornando as colunas de arestas de cada bloco
+    no mesmo formato de _read_edges
+    """
+    with open(path, 'rb') as f:
+        f.readline()
+        cols = 0 # Número de colunas de cada aresta
+        rest = b'' # Linha incompleta do final do bloco anterior
+
+        while True:
+            buf = f.read(chunk_size)
+            if buf:
+                buf = rest + buf
+                cut = buf.rfind(b'\n') + 1
+                data, rest = buf[:cut], buf[cut:]
+            else:
+                data, rest = rest, b''
+
+            if data.strip():
+                if cols == 0:
+                    cols = len(data.lstrip().split(b'\n', 1)[0].split())
+                data = np.fromstring(data, dtype=np.float64 if cols > 2 else np.int64, sep=' ')
+                data = data.reshape(-1, cols)
+                src = data[:, 0].astype(np.int64) - 1
+                dst = data[:, 1].astype(np.int64) - 1
+                w = data[:, 2].copy() if cols > 2 else None
+                yield src, dst, w
+
+            if not buf:
+                break
+
+
+
+def _stream_csr(path, chunk_size, weight=False, directed=False):
+    """
+    Constrói a representação CSR lendo o arquivo em blocos de chunk_size bytes, em
+    duas passadas: a primeira conta o grau de cada vértice e a segunda coloca cada
+    aresta diretamente na sua posição final. Assim, além do próprio grafo, a
+    memória usada é limitada pelo tamanho dos blocos
+    """
+    with open(path, 'r') as f:
+        n = int(f.readline())
+
+    # Primeira passada: contando os graus (ainda com as arestas repetidas)
+    counts = np.zeros(n, dtype=np.int64)
+    for src, dst, w in _iter_edges(path, chunk_size):
+        np.add.at(counts, src, 1)
+        if not directed:
+            np.add.at(counts, dst, 1)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    weights = np.empty(indptr[-1], dtype=np.float64) if weight else None
+
+    # Segunda passada: colocando cada aresta na sua linha, na ordem do arquivo
+    cursor = indptr[:-1].copy() # Próxima posição livre de cada linha
+    for src, dst, w in _iter_edges(path, chunk_size):
+        if not directed:
+            src, dst = np.column_stack((src, dst)).ravel(), np.column_stack((dst, src)).ravel()
+            if weight:
+                w = np.repeat(w, 2)
+        # Com pesos a ordem do arquivo precisa ser mantida dentro de cada linha
+        order = np.argsort(src, kind='stable' if weight else None)
+        src = src[order]
+        # Início e tamanho do grupo de cada origem neste bloco
+        starts = np.flatnonzero(np.concatenate(([True], src[1:] != src[:-1])))
+        sizes = np.diff(np.append(starts, len(src)))
+        # Posição de cada aresta dentro do grupo da sua origem
+        rank = np.arange(len(src)) - np.repeat(starts, sizes)
+        pos = cursor[src] + rank
+        indices[pos] = dst[order]
+        if weight:
+            weights[pos] = w[order]
+        cursor[src[starts]] += sizes
+
+    # Ordenando os vizinhos e removendo as arestas repetidas, em blocos de linhas
+    # com no máximo 'block' entradas. Como as linhas só diminuem, os resultados
+    # podem ser escritos nos próprios arrays
+    block = max(1 << 16, chunk_size // 16)
+    new_indptr = np.zeros(n + 1, dtype=np.int64)
+    out = 0
+    row = 0
+    while row < n:
+        end = max(row + 1, int(np.searchsorted(indptr, indptr[row] + block, 'right')) - 1)
+        end = min(end, n)
+        a, b = indptr[row], indptr[end]
+        local = np.repeat(np.arange(end - row), np.diff(indptr[row:end+1]))
+        key, w = _sort_edges(local * n + indices[a:b], weights[a:b] if weight else None)
+
+        k = len(key)
+        indices[out:out+k] = key % n
+        if weight:
+            weights[out:out+k] = w
+        new_indptr[row+1:end+1] = out + np.cumsum(np.bincount(key // n, minlength=end - row))
+        out += k
+        row = end
+
+    return CSR(new_indptr, indices[:out], weights[:out] if weight else None, directed)
+
+
+
+def _build_ma(n, src, dst, w=None, directed=False):
+    """
+    Constrói a matriz de adjacência a partir das colunas de arestas: uma lista de
+    bitarray para grafos sem pesos ou uma np.matrix de pesos caso w seja dado
+    """
+    # Grafo sem pesos e não direcionado
+    if w is None:
+        # Marcamos os bits de todas as arestas de uma vez em uma matriz de bytes
+        # e só então convertemos cada linha em um bitarray
+        rows = np.concatenate((src, dst))
+        cols = np.concatenate((dst, src))
+        packed = np.zeros((n, (n + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(packed, (rows, cols >> 3), (0x80 >> (cols & 7)).astype(np.uint8))
+
+        ma = []
+        for row in packed:
+            b = bitarray(endian='big')
+            b.frombytes(row.tobytes())
+            del b[n:]
+            ma.append(b)
+        return ma
+
+    # Grafo com pesos (direcionado ou não)
+    ma_w = np.full((n, n), float('inf'), dtype=np.float16)
+    np.fill_diagonal(ma_w, 0)
+    if directed:
+        ma_w[src, dst] = w
+    else:
+        # Intercalamos os dois sentidos de cada aresta para manter a ordem do arquivo
+        ma_w[np.column_stack((src, dst)).ravel(), np.column_stack((dst, src)).ravel()] = np.repeat(w, 2)
+    return np.matrix(ma_w)
+
+
+
+def _csr_to_la(csr, ordered=False):
+    """
+    Converte a representação CSR em uma lista de adjacência (dicionário de
+    conjuntos). Apenas os vértices com algum vizinho aparecem como chave. Com
+    ordered, os vizinhos de cada vértice ficam em ordem crescente em um
+    array('i') (ou em uma lista de tuplas (vizinho, peso), com pesos)
+    """
+    la = {}
+    indptr = csr.indptr.tolist()
+    if ordered and csr.weights is None:
+        # Copiamos cada linha de indices direto para o seu array('i'), sem passar
+        # por listas de inteiros do Python
+        buf = (csr.indices + 1).astype(np.intc).tobytes()
+        size = np.dtype(np.intc).itemsize
+        for v in range(len(csr)):
+            a, b = indptr[v], indptr[v+1]
+            if a != b:
+                row = la[v+1] = array('i')
+                row.frombytes(buf[a*size:b*size])
+        return la
+    indices = (csr.indices + 1).tolist()
+    weights = csr.weights.tolist() if csr.weights is not None else None
+    for v in range(len(csr)):
+        a, b = indptr[v], indptr[v+1]
+        if a == b:
+            continue
+        if weights is None:
+            la[v+1] = set(indices[a:b])
+        elif ordered:
+            la[v+1] = list(zip(indices[a:b], weights[a:b]))
+        else:
+            la[v+1] = set(zip(indices[a:b], weights[a:b]))
+    return la
+
+
+
+def _num_vertices(g):
+    """
+    Número de vértices do grafo. Na lista de adjacência apenas os vértices com
+    vizinhos são chaves, então usamos o maior vértice que aparece no grafo
+    """
+    g = _unwrap(g)
+    n = len(g)
+    if isinstance(g, dict):
+        for v in g:
+            if g[v]:
+                u = max(g[v])
+                n = max(n, v, u[0] if isinstance(u, tuple) else u)
+    return n
+
+
+
+def _to_csr(g):
+    """
+    Converte qualquer representação do grafo (matriz de adjacência de bitarray ou
+    de pesos, lista de adjacência ou CSR) para o formato CSR
+    """
+    g = _unwrap(g)
+    if isinstance(g, CSR):
+        return g
+    n = _num_vertices(g)
+
+    # Matriz de adjacência sem pesos (lista de bitarray)
+    if isinstance(g, list):
+        src, dst = [], []
+        for v in range(n):
+            row = np.unpackbits(np.frombuffer(g[v].tobytes(), dtype=np.uint8))[:n]
+            nbrs = np.flatnonzero(row)
+            src.append(np.full(len(nbrs), v, dtype=np.int64))
+            dst.append(nbrs)
+        return _build_csr(n, np.concatenate(src), np.concatenate(dst), directed=True)
+
+    # Lista de adjacência (com ou sem pesos)
+    elif isinstance(g, dict):
+        src, dst, w = [], [], []
+        for v in g:
+            for u in g[v]:
+                src.append(v-1)
+                if isinstance(u, tuple):
+                    dst.append(u[0]-1)
+                    w.append(u[1])
+                else:
+                    dst.append(u-1)
+        return _build_csr(n, src, dst, w if w else None, directed=True)
+
+    # Matriz de adjacência com pesos (np.matrix)
+    else:
+        m = np.asarray(g, dtype=np.float64)
+        mask = np.isfinite(m)
+        np.fill_diagonal(mask, False)
+        src, dst = np.nonzero(mask)
+        return _build_csr(n, src, dst, m[src, dst], directed=True)
+
+
+
+# Cabeçalho do cache binário: assinatura, versão, flags (bit 0: pesos, bit 1:
+# direcionado), n, número de entradas em indices e o tamanho (bytes) e a data de
+# modificação (ns) do arquivo texto de origem
+_CACHE_MAGIC = b'GRAFOCSR'
+_CACHE_VERSION = 1
+_CACHE_HEADER = struct.Struct('<8sIIqqqq')
+_CACHE_DATA = 64 # Posição em que os arrays começam no arquivo
+
+
+def _cache_path(path, weight, directed):
+    """
+    Caminho padrão do cache binário de um arquivo texto de grafo
+    """
+    return path + '.' + ('w' if weight else '') + ('d' if directed else '') + 'csr'
+
+
+
+def _write_cache(cache_path, csr, stat):
+    """
+    Escreve a representação CSR no formato binário do cache. O arquivo é escrito
+    em um temporário e renomeado no final, para que outros processos nunca vejam
+    um cache pela metade
+    """
+    n, nnz = len(csr), len(csr.indices)
+    flags = (csr.weights is not None) | (csr.directed << 1)
+    tmp = cache_path + '.' + str(os.getpid()) + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, flags, n, nnz,
+                                   stat.st_size, stat.st_mtime_ns))
+        f.write(bytes(_CACHE_DATA - _CACHE_HEADER.size))
+        f.write(np.ascontiguousarray(csr.indptr, dtype='<i8').tobytes())
+        f.write(np.ascontiguousarray(csr.indices, dtype='<i4').tobytes())
+        if csr.weights is not None:
+            f.write(bytes(-f.tell() % 8)) # Alinhando os pesos em 8 bytes
+            f.write(np.ascontiguousarray(csr.weights, dtype='<f8').tobytes())
+    os.replace(tmp, cache_path)
+
+
+
+def _open_cache(cache_path, stat, weight, directed):
+    """
+    Reabre o cache binário com numpy.memmap. Retorna None caso o cache não exista
+    ou não corresponda mais ao arquivo texto (tamanho ou data de modificação
+    diferentes) ou aos parâmetros pedidos
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            header = f.read(_CACHE_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _CACHE_HEADER.size:
+        return None
+
+    magic, version, flags, n, nnz, size, mtime = _CACHE_HEADER.unpack(header)
+    if (magic != _CACHE_MAGIC or version != _CACHE_VERSION or flags != (weight | (directed << 1))
+            or size != stat.st_size or mtime != stat.st_mtime_ns):
+        return None
+
+    offset = _CACHE_DATA
+    indptr = np.memmap(cache_path, dtype='<i8', mode='r', offset=offset, shape=(n + 1,))
+    offset += 8 * (n + 1)
+    if nnz == 0:
+        # Não é possível mapear um array vazio
+        indices = np.zeros(0, dtype=np.int32)
+        weights = np.zeros(0, dtype=np.float64) if weight else None
+        return CSR(indptr, indices, weights, directed)
+
+    indices = np.memmap(cache_path, dtype='<i4', mode='r', offset=offset, shape=(nnz,))
+    offset += 4 * nnz
+    weights = None
+    if weight:
+        offset += -offset % 8
+        weights = np.memmap(cache_path, dtype='<f8', mode='r', offset=offset, shape=(nnz,))
+    return CSR(indptr, indices, weights, directed)
+
+
+
+def read_graph(path, g_type, weight=False, directed=False, cache=False, chunk_size=None, ordered=False):
     """ 
     Cria uma representação do grafo a partir de um arquivo texto
     ------------------------------------------------------------------------------
     ENTRADA:
         - path (string): caminho para o arquivo texto do grafo que será lido
         - g_type (string): tipo de representção do grafo, podendo ser 'ma' (matriz
-        de adjacência) ou 'la' (lista de adjacência)
+        de adjacência), 'la' (lista de adjacência) ou 'csr' (arrays CSR)
         - weight (boolean): indica se é um grafo com pesos nas arestas ou não
         - directed (boolean): indica se o grafo é direcionado ou não
+        - cache (boolean ou string): se verdadeiro, a representação CSR do grafo é
+        guardada em um arquivo binário (por padrão ao lado de path) e reaberta com
+        numpy.memmap nas próximas leituras, enquanto o tamanho e a data de
+        modificação do arquivo texto não mudarem. Também pode ser o caminho do
+        arquivo de cache
+        - chunk_size (int): se dado, o arquivo é lido em blocos de no máximo
+        chunk_size bytes e o grafo é construído em duas passadas, sem guardar todas
+        as arestas lidas. Permite ler arquivos maiores que a memória disponível
+        - ordered (boolean): na lista de adjacência, guarda os vizinhos de cada
+        vértice já em ordem crescente em um array('i') (lista de tuplas (vizinho,
+        peso) com pesos) em vez de um conjunto, de modo que as buscas percorrem os
+        vizinhos diretamente, sem ordená-los a cada visita
     ------------------------------------------------------------------------------
     SAÍDA:
         - matriz de adjacência (lista)
         ou
         - lista de adjacência (dicionário)
+        ou
+        - grafo no formato CSR (CSR)
     """
-    with open(path, 'r') as f:
-        n = f.readline()
-        n = int(n) # Número de vértices do grafo
-        A = [] # Lista que conterá as arestas do grafo
-
-        # Percorrendo o restante das linhas do arquivo e adicionando em A
-        # as listas que representam as arestas
-        for line in f:
-            a = line.split(' ')
-            for i in range(2):
-                a[i] = int(a[i])
-            if (weight == True):
-                a[2] = float(a[2])
-
-            A.append(a)
-
-        # Criando a matriz de adjacência
-        if g_type == 'ma':
-            # Grafo sem pesos enão direcionado
-            if weight == False:
-                ma = [bitarray([0]*n) for i in range(n)]
-                for a in A:
-                    ma[a[0]-1][a[1]-1] = 1
-                    ma[a[1]-1][a[0]-1] = 1
-                return ma
-
-            # Grafo com pesos e não direcionado
-            elif weight == True and directed == False:
-                ma_w = np.matrix([[float('inf')]*n]*n, dtype=np.float16)
-
-                for i in range(n):
-                    ma_w[i, i] = 0
-                for a in A:
-                    ma_w[a[0]-1, a[1]-1] = a[2]
-                    ma_w[a[1]-1, a[0]-1] = a[2]
-                return ma_w
-
-            # Grafo com pesos e direcionado
-            elif weight == True and directed == True:
-                ma_w = np.matrix([[float('inf')]*n]*n, dtype=np.float16)
-                for i in range(n):
-                    ma_w[i, i] = 0
-                for a in A:
-                    ma_w[a[0]-1, a[1]-1] = a[2]
-                return ma_w
-
-
-        # Criando a lista de adjacência
-        if g_type == 'la':
-            la = {} # Dicionário inicialmente vazio 
-            if (weight == False):
-                for a in A:
-                    if a[0] in la:
-                        la[a[0]].add(a[1])
-                    else:
-                        la[a[0]] = {a[1]}
-
-                    if a[1] in la:
-                        la[a[1]].add(a[0])
-                    else:
-                        la[a[1]] = {a[0]}
-                
-            elif weight == True:
-                for a in A:
-                    if a[0] in la:
-                        la[a[0]].add((a[1], a[2]))
-                    else:
-                        la[a[0]] = {(a[1], a[2])}
-
-                    if directed == False:
-                        if a[1] in la:
-                            la[a[1]].add((a[0], a[2]))
-                        else:
-                            la[a[1]] = {(a[0], a[2])}
-
-            return la
-                        
-
-        # Caso o usuário tenha passado um tipo errado de representação
+    # Caso o usuário tenha passado um tipo errado de representação
+    if g_type not in ('ma', 'la', 'csr'):
+        print('\nTipo errado de representção do grafo. Escolher entre "ma" (matriz'
+              + 'de adjacência), "la" (lista de adjacência) ou "csr" (arrays CSR)')
+        return
+
+    # Sem pesos, a matriz e a lista de adjacência são sempre não direcionadas
+    directed = bool(directed and (weight or g_type == 'csr'))
+
+    csr = None
+    if cache:
+        if not isinstance(cache, str):
+            cache = _cache_path(path, weight, directed)
+        stat = os.stat(path)
+        csr = _open_cache(cache, stat, weight, directed)
+
+    if csr is None and (cache or chunk_size):
+        if chunk_size:
+            csr = _stream_csr(path, chunk_size, weight, directed)
+        else:
+            n, src, dst, w = _read_edges(path, weight)
+            csr = _build_csr(n, src, dst, w if weight else None, directed)
+
+        if cache:
+            try:
+                _write_cache(cache, csr, stat)
+            except OSError:
+                pass # Sem permissão de escrita o cache é apenas ignorado
+
+    # Obtendo a representação pedida a partir dos arrays CSR
+    if csr is not None:
+        if g_type == 'csr':
+            return csr
+        elif g_type == 'la':
+            return _csr_to_la(csr, ordered)
         else:
-            print('\nTipo errado de representção do grafo. Escolher entre "ma" (matriz'
-                  + 'de adjacência) ou "la" (lista de adjacência)')
+            src = np.repeat(np.arange(len(csr)), np.diff(csr.indptr))
+            return _build_ma(len(csr), src, np.asarray(csr.indices, dtype=np.int64),
+                             csr.weights, True)
 
+    # Lendo todas as arestas do arquivo em colunas do NumPy
+    n, src, dst, w = _read_edges(path, weight)
+    if weight == False:
+        w = None
 
+    # Criando a matriz de adjacência
+    if g_type == 'ma':
+        return _build_ma(n, src, dst, w, directed)
 
-def num_edges(g, weight=False):
+    # Criando a lista de adjacência
+    elif g_type == 'la':
+        return _csr_to_la(_build_csr(n, src, dst, w, directed), ordered)
+
+    # Criando a representação CSR
+    else:
+        return _build_csr(n, src, dst, w, directed)
+
+
+
+def _cached(g, key, f):
     """
-    Determina o número de arestas de um grafo
+    Retorna f(g), guardando o resultado no próprio objeto do grafo (atributo
+    _cache) quando a representação permite, para que as próximas chamadas não
+    precisem percorrer o grafo novamente
+    """
+    cache = getattr(g, '_cache', None)
+    if cache is None:
+        try:
+            cache = g._cache = {}
+        except AttributeError: # list e dict não aceitam novos atributos
+            return f(g)
+    if key not in cache:
+        cache[key] = f(g)
+    return cache[key]
+
+
+
+def _degree_array(g):
+    """
+    Calcula o grau de todos os vértices do grafo em uma única passada
+    """
+    g = _unwrap(g)
+    # Matriz de adjacência: contagem de bits (popcount) de cada linha
+    if isinstance(g, list):
+        return np.fromiter((l.count() for l in g), dtype=np.int64, count=len(g))
+
+    # Lista de adjacência: vértices que não são chaves do dicionário têm grau 0
+    elif isinstance(g, dict):
+        d = np.zeros(_num_vertices(g), dtype=np.int64)
+        d[np.fromiter(g, dtype=np.int64, count=len(g)) - 1] = np.fromiter(
+            (len(g[v]) for v in g), dtype=np.int64, count=len(g))
+        return d
+
+    # Formato CSR
+    elif isinstance(g, CSR):
+        return np.diff(g.indptr)
+
+    # Matriz de adjacência com pesos
+    g = np.asarray(g)
+    return np.count_nonzero(np.isfinite(g), axis=1) - np.isfinite(np.diag(g))
+
+
+
+def degrees(g):
+    """
+    Determina o grau de cada vértice de um grafo. O resultado fica guardado no
+    objeto do grafo quando possível
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
-        - weight (boolean): indica se é um grafo com pesos nas arestas ou não
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
-        - a_n (int): número de arestas
+        - d (np.ndarray): graus dos vértices
     """
-    a_n = 0
-    v_n = len(g) # número de vértices do grafo
+    return _cached(g, 'degrees', _degree_array)
 
-    # Caso o grafo seja representado por uma matriz de adjacência
+
+
+def _count_edges(g):
+    """
+    Conta as arestas do grafo, contando cada aresta não direcionada uma única vez.
+    Em um dicionário ou matriz com pesos cuja direção não é conhecida, cada par de
+    vértices adjacentes é contado uma única vez
+    """
+    directed = _is_directed(g)
+    g = _unwrap(g)
+    # Matriz de adjacência: as arestas são os bits da parte triangular superior,
+    # ou seja, (soma dos graus + laços) / 2
     if isinstance(g, list):
-        x = 0 # Variável que nos fará percorrer apenas a perte triangular superior da matriz
-        if weight == False:
-            for l in g:
-                for i in range(x, v_n):
-                    a_n += l[i]
-                x += 1
-        # Contagem de arestas caso o grafo tenha pesos
-        else:
-            for i in range(v_n):
-                for j in range(x, v_n):
-                    if g[i][j] != float('inf') and i != j:
-                        a_n += 1
-                x += 1
+        loops = sum(g[i][i] for i in range(len(g)))
+        return (int(degrees(g).sum()) + loops) // 2
 
-    # Caso o grafo seja representado por uma lista de adjacência
+    # Lista de adjacência
     elif isinstance(g, dict):
-        edges = [[0] for i in range(v_n)] # Lista em que na posição i iremos adicionar os vértices
-                                          # que se ligam ao vértice i.
-        for v in g:
-            for u in g[v]:
-                if u not in edges[v-1]:
-                    a_n += 1
-                edges[v-1].append(u)
-                edges[u-1].append(v)
+        if directed:
+            return sum(len(g[v]) for v in g)
+        src = np.fromiter((v for v in g for u in g[v]), dtype=np.int64)
+        dst = np.fromiter((u[0] if isinstance(u, tuple) else u for v in g for u in g[v]),
+                          dtype=np.int64, count=len(src))
+        n = int(max(src.max(), dst.max())) + 1 if len(src) else 1
+        return len(np.unique(np.minimum(src, dst) * n + np.maximum(src, dst)))
+
+    # Formato CSR
+    elif isinstance(g, CSR):
+        if g.directed:
+            return len(g.indices)
+        # Cada aresta aparece nos dois sentidos, então contamos apenas as
+        # entradas em que a origem não é maior que o destino
+        rows = np.repeat(np.arange(len(g)), np.diff(g.indptr))
+        return int(np.count_nonzero(rows <= g.indices))
+
+    # Matriz de adjacência com pesos, sem a diagonal: todas as entradas em grafos
+    # direcionados, senão a parte triangular superior da matriz simetrizada
+    mask = np.isfinite(np.asarray(g))
+    np.fill_diagonal(mask, False)
+    if directed:
+        return int(np.count_nonzero(mask))
+    return int(np.count_nonzero((mask | mask.T)[np.triu_indices(len(mask), 1)]))
 
-    return a_n
+
+
+def num_edges(g, weight=False):
+    """
+    Determina o número de arestas de um grafo
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - weight (boolean): indica se é um grafo com pesos nas arestas ou não
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - a_n (int): número de arestas
+    """
+    return _cached(g, 'num_edges', _count_edges)
 
 
 
@@ -156,31 +782,13 @@ def min_degree(g):
     Determina o grau mínimo dos vértices de um grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
         - d_min (int): grau mínimo
     """
-    degrees = [] # Lista que conterá o grau de cada vértice do grafo
-
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        d = 0 # Grau do vértice que está sendo analisado
-        for l in g:
-            for e in l:
-                d += e
-            degrees.append(d)
-            d = 0
-        d_min = min(degrees) 
-
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        for v in g:
-            degrees.append(len(g[v]))
-        d_min = min(degrees)
-
-    return d_min
+    return int(degrees(g).min())
 
 
 
@@ -189,31 +797,13 @@ def max_degree(g):
     Determina o grau máximo dos vértices de um grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
         - d_min (int): grau máximo
     """
-    degrees = [] # Lista que conterá o grau de cada vértice do grafo
-
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        d = 0 # Grau do vértice que está sendo analisado
-        for l in g:
-            for e in l:
-                d += e
-            degrees.append(d)
-            d = 0
-        d_max = max(degrees)
-
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        for v in g:
-            degrees.append(len(g[v]))
-        d_max = max(degrees)
-
-    return d_max
+    return int(degrees(g).max())
 
 
 
@@ -222,30 +812,14 @@ def mean_degree(g):
     Determina a média dos graus dos vértices de um grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
         - mean (float): média dos graus
     """
-    v_n = len(g) # número de vértices do grafo
-    degrees = [] # Lista que conterá o grau de cada vértice do grafo
-
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        d = 0 # Grau do vértice que está sendo analisado
-        for l in g:
-            for e in l:
-                d += e
-            degrees.append(d)
-            d = 0
-
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        for v in g:
-            degrees.append(len(g[v]))
-    
-    mean = sum(degrees)/v_n
+    d = degrees(g)
+    mean = int(d.sum())/len(d)
     return round(mean, 2)
 
 
@@ -255,442 +829,1150 @@ def median_degree(g):
     Determina a mediana dos graus dos vértices de um grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
         - median (int): mediana dos graus
     """
-    v_n = len(g) # número de vértices do grafo
-    degrees = [] # Lista que conterá o grau de cada vértice do grafo
+    d = degrees(g)
+    v_n = len(d)
 
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        d = 0 # Grau do vértice que está sendo analisado
-        for l in g:
-            for e in l:
-                d += e
-            degrees.append(d)
-            d = 0
-
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        for v in g:
-            degrees.append(len(g[v]))
-
-    # Ordenamos a lista de graus para podermos selecionar a mediana
-    degrees.sort()
+    # Selecionamos apenas as posições da mediana (np.partition, em tempo linear)
+    # em vez de ordenar toda a lista de graus
     if v_n % 2 == 0:
-        median = degrees[v_n//2]
+        median = int(np.partition(d, v_n//2)[v_n//2])
     else:
-        median = (degrees[(v_n - 1)//2] + degrees[(v_n + 1)//2]) // 2
+        k = [(v_n - 1)//2, min((v_n + 1)//2, v_n - 1)]
+        part = np.partition(d, k)
+        median = (int(part[k[0]]) + int(part[k[1]])) // 2
 
     return median
 
 
 
-def BFS(g, v_1):
-    '''
-    Implementação do algoritmo de busca em largura
+def degree_histogram(g):
+    """
+    Determina a distribuição dos graus dos vértices de um grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
-        - v_1 (int): vértice inicial
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
-        - explored (list): lista contendo os vértices do grafo na ordem em que foram
-        explorados (removidos da fila)
-    '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram explorados
-    visited[v_1-1] = 1
-    explored = []
-    Q = [v_1]
+        - hist (np.ndarray): hist[d] é o número de vértices com grau d
+    """
+    return _cached(g, 'degree_histogram', lambda g: np.bincount(degrees(g)))
+
+
 
-    # Caso o grafo seja representado por uma lista de adjacência
+def degree_stats(g):
+    """
+    Determina todas as estatísticas de grau do grafo a partir de um único vetor de
+    graus
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - stats (dict): número de arestas ('edges'), grau mínimo ('min'), máximo
+        ('max'), médio ('mean'), mediana ('median') e histograma ('hist')
+    """
+    return {'edges': num_edges(g),
+            'min': min_degree(g),
+            'max': max_degree(g),
+            'mean': mean_degree(g),
+            'median': median_degree(g),
+            'hist': degree_histogram(g)}
+
+
+
+def _is_ordered(g):
+    """
+    Indica se a lista de adjacência g guarda os vizinhos em ordem crescente
+    (array('i') ou lista), como em read_graph com ordered
+    """
+    for v in g:
+        return not isinstance(g[v], set)
+    return True
+
+
+
+def _neighbors(g):
+    '''
+    Retorna uma função que, dado um vértice v, retorna a lista dos seus vizinhos
+    em ordem crescente, qualquer que seja a representação do grafo
+    '''
+    # Em um Graph com lista de adjacência, as listas ordenadas ficam guardadas
+    if isinstance(g, Graph):
+        if isinstance(g.g, dict) and not _is_ordered(g.g):
+            nbrs = _cached(g, 'neighbors', lambda G: {v: sorted(G.g[v]) for v in G.g})
+            return lambda v: nbrs.get(v, [])
+        g = g.g
+
+    # Matriz de adjacência (lista de bitarray)
     if isinstance(g, list):
-        while Q:
-            v = Q.pop(0)
-            for i in range(len(g)):
-                if g[v-1][i] == 1 and visited[i] == 0:
-                    visited[i] = 1
-                    Q.append(i+1)
-            explored.append(v) 
-
-    # Caso o grafo seja representado por uma lista de adjacência
+        one = bitarray('1')
+        return lambda v: [i+1 for i in g[v-1].search(one)]
+
+    # Lista de adjacência. Na lista ordenada (read_graph com ordered) os vizinhos
+    # já estão em ordem crescente e são usados diretamente
     elif isinstance(g, dict):
-        while Q:
-            v = Q.pop(0)
-            for u in sorted(g[v]):
-                if u in g[v] and visited[u-1] == 0:
-                    visited[u-1] = 1
-                    Q.append(u)
-            explored.append(v) 
-    
-    return explored
+        if _is_ordered(g):
+            return lambda v: g.get(v, ())
+        return lambda v: sorted(g.get(v, ()))
 
+    # Formato CSR
+    elif isinstance(g, CSR):
+        indptr, indices = g.indptr, g.indices
+        return lambda v: (indices[indptr[v-1]:indptr[v]] + 1).tolist()
 
 
-def genTree_BFS(g, v_1, path):
+
+def _bfs(g, v_1, target=None):
     '''
-    Cria um novo arquivo texto contendo a árvore gerada pelo algoritmo de busca em
-    largura (BFS) a partir do vértice v_1
+    Busca em largura sincronizada por níveis, usada por todas as funções baseadas
+    na BFS. Cada vértice e cada aresta são visitados uma única vez, em O(n + m)
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
         - v_1 (int): vértice inicial
-        - path (string): caminho que será usado para criar o arquivo texto contendo
-        as informações da árvore
+        - target (int): se dado, a busca termina no nível em que target é encontrado
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - order (list): vértices na ordem em que foram explorados (removidos da fila)
+        - prev (list): prev[v-1] é o pai do vértice v na árvore da BFS
+        - levels (list): levels[v-1] é o nível do vértice v na árvore da BFS (None
+        caso v não seja alcançado a partir de v_1)
     '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram explorados
-    visited[v_1-1] = 1
-    levels = [None] * len(g) # Lista dos níveis de cada vértice da árvore gerada 
+    nbrs = _neighbors(g)
+    n = _num_vertices(g) # Em dicionários direcionados, nem todo vértice é chave
+    prev = [None] * n # Lista informando o pai de cada vértice
+    levels = [None] * n # Lista dos níveis de cada vértice da árvore gerada
     levels[v_1-1] = 0
-    prev = [None] * len(g) # Lista informando o pai de cada vértice
-    Q = [v_1]
+    order = []
 
     layer = 0 # Atual camada na qual estamos buscando os seus vértices
-    cur_layer = [] # Lista em que serão adicionados os vértices correspondendo à camada atual
-    layers = [[v_1]] # Lista contendo os vértices agrupados pelas suas respectivas camadas
-                     # Ex: layers[i] é a lista dos vértices contidos na camada i
+    frontier = [v_1] # Vértices da camada atual, na ordem em que entraram na fila
+    while frontier:
+        order.extend(frontier)
+        if target is not None and levels[target-1] is not None:
+            break
+
+        # Os filhos dos vértices da camada atual formam a próxima camada
+        next_frontier = []
+        for v in frontier:
+            for u in nbrs(v):
+                if levels[u-1] is None:
+                    levels[u-1] = layer + 1
+                    prev[u-1] = v
+                    next_frontier.append(u)
+        frontier = next_frontier
+        layer += 1
 
-    # Caso o grafo seja representado por uma lista de adjacência
-    if isinstance(g, list):
-        while Q:
-            v = Q.pop(0)
-            for i in range(len(g)):
-                # Encontrando os vértices filhos de v
-                if g[v-1][i] == 1 and visited[i] == 0:
-                    visited[i] = 1
-                    Q.append(i+1)
-                    prev[i] = v
-
-                # Determinando em que camada os véstices se encontram
-                for u in layers[layer]:
-                    if g[i][u-1] == 1 and levels[i] == None:
-                        levels[i] = layer + 1
-                        cur_layer.append(i+1)
-
-            # Depois teremos todos os vértices da camada atual contidos em cur_layer
-            layers.append(cur_layer)
-            # Caso a camada atual não seja vazia, incrementamos 'layer' para podermos encontrar os 
-            # vértices da próxima camada
-            if cur_layer:
-                layer += 1
-                cur_layer = []
+    return order, prev, levels
 
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        while Q:
-            v = Q.pop(0)
-            for u in sorted(g[v]):
-                if u in g[v] and visited[u-1] == 0:
-                    visited[u-1] = 1
-                    Q.append(u)
-                    prev[u-1] = v
 
-                for w in layers[layer]:
-                    if u in g[w] and levels[u-1] == None:
-                        levels[u-1] = layer + 1
-                        cur_layer.append(u)
 
-            layers.append(cur_layer)
-            if cur_layer:
+def _bfs_hybrid_csr(g, v_1, target=None, alpha=14, beta=24, small=64):
+    '''
+    Versão de _bfs_hybrid para o formato CSR, em que cada passo é feito com
+    operações do NumPy sobre os arrays do grafo. O passo bottom-up verifica, em
+    rodadas, o k-ésimo vizinho de cada vértice ainda sem pai, de modo que são
+    verificadas exatamente as mesmas arestas da versão vértice a vértice. Enquanto
+    a fronteira tem menos de small vértices, os passos top-down são feitos vértice
+    a vértice, como em _bfs, evitando o custo fixo das operações do NumPy em
+    grafos com muitos níveis estreitos (caminhos, grades). Retorna
+    order, prev e levels como arrays do NumPy (vértices indexados a partir de 0 e -1
+    para os vértices não alcançados), além das estatísticas da busca
+    '''
+    n = len(g)
+    indptr, indices = g.indptr, g.indices
+    deg = np.diff(indptr)
+    levels = np.full(n, -1, dtype=np.int64)
+    prev = np.full(n, -1, dtype=np.int64)
+    levels[v_1-1] = 0
+    order = []
+    edges = 0
+    steps = []
+
+    m_u = int(deg.sum() - deg[v_1-1])
+    unvisited = None
+    layer = 0
+    frontier = np.array([v_1-1], dtype=np.int64)
+    bottom_up = False
+    while frontier.size:
+        order.append(frontier)
+        if target is not None and levels[target-1] != -1:
+            break
+
+        if not g.directed:
+            if not bottom_up:
+                bottom_up = int(deg[frontier].sum()) > m_u / alpha
+            else:
+                bottom_up = frontier.size >= n / beta
+
+        if not bottom_up and frontier.size < small:
+            # Passos top-down vértice a vértice, nível após nível, até a fronteira
+            # crescer ou ficar pesada o bastante para um passo bottom-up
+            F = frontier.tolist()
+            while True:
+                steps.append('td')
+                next_F = []
+                d_next = 0
+                for v in F:
+                    a, b = int(indptr[v]), int(indptr[v+1])
+                    edges += b - a
+                    for u in indices[a:b].tolist():
+                        if levels[u] == -1:
+                            levels[u] = layer + 1
+                            prev[u] = v
+                            next_F.append(u)
+                            d_next += int(deg[u])
+                m_u -= d_next
+                F = next_F
                 layer += 1
-                cur_layer = []
+                if not F or len(F) >= small or (not g.directed and d_next > m_u / alpha):
+                    break
+                order.append(F)
+                if target is not None and levels[target-1] != -1:
+                    F = []
+                    break
+            frontier = np.array(F, dtype=np.int64)
+            unvisited = None
+            continue
+
+        if bottom_up:
+            steps.append('bu')
+            in_frontier = np.zeros(n, dtype=bool)
+            in_frontier[frontier] = True
+            if unvisited is None:
+                unvisited = np.flatnonzero(levels == -1)
+
+            # Rodada k: o k-ésimo vizinho de cada vértice que ainda não achou pai
+            cand = unvisited
+            found, parents = [], []
+            k = 0
+            while cand.size:
+                pos = indptr[cand] + k
+                ok = pos < indptr[cand+1]
+                cand, pos = cand[ok], pos[ok]
+                edges += cand.size
+                u = indices[pos]
+                hit = in_frontier[u]
+                found.append(cand[hit])
+                parents.append(u[hit])
+                cand = cand[~hit]
+                k += 1
+
+            found = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+            parents = np.concatenate(parents) if parents else np.zeros(0, dtype=np.int64)
+            idx = np.argsort(found)
+            next_frontier = found[idx]
+            prev[next_frontier] = parents[idx]
+            levels[next_frontier] = layer + 1
+            unvisited = unvisited[levels[unvisited] == -1]
+        else:
+            steps.append('td')
+            # Todas as arestas da fronteira, na ordem dos vértices da fronteira
+            starts = indptr[frontier]
+            counts = indptr[frontier+1] - starts
+            total = int(counts.sum())
+            edges += total
+            pos = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            nbr = indices[pos].astype(np.int64)
+            src = np.repeat(frontier, counts)
+
+            # Cada vértice novo recebe como pai o primeiro vértice da fronteira que o
+            # encontrou, e entra na próxima fronteira nessa mesma ordem
+            new = levels[nbr] == -1
+            nbr, src = nbr[new], src[new]
+            first = np.sort(np.unique(nbr, return_index=True)[1])
+            next_frontier = nbr[first]
+            prev[next_frontier] = src[first]
+            levels[next_frontier] = layer + 1
+            unvisited = None
+
+        m_u -= int(deg[next_frontier].sum())
+        frontier = next_frontier
+        layer += 1
 
+    return np.concatenate(order), prev, levels, edges, steps
 
-    with open(path, 'w') as f:
-        f.write('Árvore gerada pelo algoritmo de busca em largura (BFS) a partir do vértice ' + str(v_1) + ': \n\n')
 
-        for i in range(layer+1):
-            for v in layers[i]:
-                f.write('Vértice: ' + str(v) + ', Pai: ' + str(prev[v-1]) + ', Nível: ' + str(levels[v-1]) + '\n')
 
+def _bfs_hybrid(g, v_1, target=None, stats=None, alpha=14, beta=24):
+    '''
+    Busca em largura com otimização de direção (Beamer et al.): em cada nível a
+    busca escolhe entre expandir os vértices da fronteira (top-down) ou procurar,
+    para cada vértice ainda não visitado, um vizinho na fronteira (bottom-up), que
+    é muito mais barato quando a fronteira contém boa parte do grafo
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (dicionário ou CSR): grafo reprasentado por uma lista de adjacência ou
+        no formato CSR (grafos direcionados usam apenas passos top-down)
+        - v_1 (int): vértice inicial
+        - target (int): se dado, a busca termina no nível em que target é encontrado
+        - stats (dict): se dado, recebe o número de arestas verificadas ('edges') e
+        a direção usada em cada nível ('steps')
+        - alpha, beta (int): a busca passa para bottom-up quando as arestas da
+        fronteira superam 1/alpha das arestas dos vértices não visitados, e volta
+        para top-down quando a fronteira tem menos de n/beta vértices
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - order (list): vértices na ordem em que foram explorados, nível por nível
+        - prev (list): prev[v-1] é o pai do vértice v na árvore da BFS
+        - levels (list): levels[v-1] é o nível do vértice v na árvore da BFS (None
+        caso v não seja alcançado a partir de v_1)
+    '''
+    if isinstance(_unwrap(g), CSR):
+        order, prev, levels, edges, steps = _bfs_hybrid_csr(_unwrap(g), v_1, target, alpha, beta)
+        if stats is not None:
+            stats['edges'] = edges
+            stats['steps'] = steps
+        order = (order + 1).tolist()
+        prev = [None if p < 0 else p + 1 for p in prev.tolist()]
+        levels = [None if l < 0 else l for l in levels.tolist()]
+        return order, prev, levels
+
+    n = _num_vertices(g)
+    nbrs = _neighbors(g)
+    deg = [len(_unwrap(g).get(v+1, ())) for v in range(n)]
+    directed = _is_directed(g)
+
+    prev = [None] * n
+    levels = [None] * n
+    levels[v_1-1] = 0
+    order = []
+    edges = 0 # Número de arestas verificadas
+    steps = []
+
+    m_u = sum(deg) - deg[v_1-1] # Arestas dos vértices ainda não visitados
+    unvisited = None # Vértices não visitados, usados apenas nos passos bottom-up
+    layer = 0
+    frontier = [v_1]
+    bottom_up = False
+    while frontier:
+        order.extend(frontier)
+        if target is not None and levels[target-1] is not None:
+            break
+
+        # Escolhendo a direção do próximo passo. Em grafos direcionados o passo
+        # bottom-up procuraria pais entre os sucessores, por isso não é usado
+        if directed:
+            pass
+        elif not bottom_up:
+            m_f = sum(deg[v-1] for v in frontier)
+            bottom_up = m_f > m_u / alpha
+        else:
+            bottom_up = len(frontier) >= n / beta
+
+        next_frontier = []
+        if bottom_up:
+            steps.append('bu')
+            in_frontier = bytearray(n)
+            for v in frontier:
+                in_frontier[v-1] = 1
+            if unvisited is None:
+                unvisited = [v for v in range(1, n+1) if levels[v-1] is None]
+
+            # Cada vértice não visitado procura um pai na fronteira e para no
+            # primeiro que encontrar
+            remaining = []
+            for v in unvisited:
+                for u in nbrs(v):
+                    edges += 1
+                    if in_frontier[u-1]:
+                        levels[v-1] = layer + 1
+                        prev[v-1] = u
+                        next_frontier.append(v)
+                        m_u -= deg[v-1]
+                        break
+                else:
+                    remaining.append(v)
+            unvisited = remaining
+        else:
+            steps.append('td')
+            for v in frontier:
+                for u in nbrs(v):
+                    edges += 1
+                    if levels[u-1] is None:
+                        levels[u-1] = layer + 1
+                        prev[u-1] = v
+                        next_frontier.append(u)
+                        m_u -= deg[u-1]
+            unvisited = None
+
+        frontier = next_frontier
+        layer += 1
 
+    if stats is not None:
+        stats['edges'] = edges
+        stats['steps'] = steps
+    return order, prev, levels
 
-def DFS(g, v_1):
+
+
+def _bfs_bits(g, v_1, target=None):
     '''
-    Implementação do algoritmo de busca em profundidade
+    Busca em largura por fronteiras sobre a matriz de adjacência de bitarray. A
+    próxima fronteira é o OU das linhas dos vértices da fronteira atual, com os
+    vértices já visitados removidos por um E com a máscara dos não visitados, de
+    modo que cada passo processa palavras inteiras da máquina
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista): grafo reprasentado por uma matriz de adjacência
         - v_1 (int): vértice inicial
+        - target (int): se dado, a busca termina no nível em que target é encontrado
     ------------------------------------------------------------------------------
     SAÍDA:
-        - explored (list): lista contendo os vértices do grafo na ordem em que foram
-        explorados (removidos da pilha)
+        - levels (list): levels[v-1] é o nível do vértice v na árvore da BFS (None
+        caso v não seja alcançado a partir de v_1)
+        - layer (int): nível da última camada encontrada
+        - visited (bitarray): máscara dos vértices alcançados a partir de v_1
     '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram visitados
+    n = len(g)
+    one = bitarray('1')
+    levels = [None] * n
+    levels[v_1-1] = 0
+
+    visited = bitarray(n)
+    visited.setall(0)
     visited[v_1-1] = 1
-    explored = []
-    P = [v_1]
-    
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        while P:
-            u = P.pop()
-            if u not in explored:
-                explored.append(u)
-                for i in range(len(g)-1, -1, -1):
-                    if g[u-1][i] == 1:
-                        P.append(i+1)
+    frontier = visited.copy()
+
+    layer = 0
+    while True:
+        if target is not None and levels[target-1] is not None:
+            break
+
+        # Vizinhos de toda a fronteira que ainda não foram visitados
+        nxt = bitarray(n)
+        nxt.setall(0)
+        for v in frontier.search(one):
+            nxt |= g[v]
+        nxt &= ~visited
+        if not nxt.any():
+            break
 
+        layer += 1
+        for v in nxt.search(one):
+            levels[v] = layer
+        visited |= nxt
+        frontier = nxt
 
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        while P:
-            u = P.pop()
-            if u not in explored:
-                explored.append(u)
-                for v in sorted(g[u], reverse=True):
-                    P.append(v)
+    return levels, layer, visited
+
+
+
+def _bfs_levels(g, v_1, target=None, hybrid=False):
+    '''
+    Calcula apenas os níveis da BFS a partir de v_1, usando a busca por fronteiras
+    de bits na matriz de adjacência e o motor _bfs (ou _bfs_hybrid) nas demais
+    representações. Retorna a lista de níveis e o nível da última camada
+    '''
+    if isinstance(_unwrap(g), list):
+        return _bfs_bits(_unwrap(g), v_1, target)[:2]
+
+    order, prev, levels = (_bfs_hybrid if hybrid else _bfs)(g, v_1, target)
+    return levels, levels[order[-1]-1]
 
+
+
+def BFS(g, v_1, hybrid=False):
+    '''
+    Implementação do algoritmo de busca em largura
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+        - hybrid (boolean): usa a busca com otimização de direção (top-down/
+        bottom-up) em listas de adjacência e no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - explored (list): lista contendo os vértices do grafo na ordem em que foram
+        explorados (removidos da fila). Com hybrid, os vértices de cada nível
+        encontrados por passos bottom-up aparecem em ordem crescente
+    '''
+    if hybrid and not isinstance(_unwrap(g), list):
+        explored = _bfs_hybrid(g, v_1)[0]
+    else:
+        explored = _bfs(g, v_1)[0]
     return explored
 
 
 
-def genTree_DFS(g, v_1, path):
+def genTree_BFS(g, v_1, path):
     '''
     Cria um novo arquivo texto contendo a árvore gerada pelo algoritmo de busca em
-    profundidade (DFS) a partir do vértice v_1
+    largura (BFS) a partir do vértice v_1
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
         - v_1 (int): vértice inicial
         - path (string): caminho que será usado para criar o arquivo texto contendo
         as informações da árvore
     '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram visitados
-    levels = [[i, None] for i in range(len(g))] # Lista dos níveis de cada vértice da árvore gerada 
-    levels[v_1-1][1] = 0
+    order, prev, levels = _bfs(g, v_1)
+
+    # Escrevemos os vértices camada por camada e, dentro de cada camada, em ordem
+    # crescente
+    with open(path, 'w') as f:
+        f.write('Árvore gerada pelo algoritmo de busca em largura (BFS) a partir do vértice ' + str(v_1) + ': \n\n')
+
+        for v in sorted(order, key=lambda v: (levels[v-1], v)):
+            f.write('Vértice: ' + str(v) + ', Pai: ' + str(prev[v-1]) + ', Nível: ' + str(levels[v-1]) + '\n')
+
+
+
+def _dfs(g, v_1):
+    '''
+    Busca em profundidade iterativa, usada por DFS e genTree_DFS. A pilha guarda,
+    para cada vértice do caminho atual, um iterador sobre os seus vizinhos em
+    ordem crescente, de modo que cada aresta é verificada uma única vez (O(n + m))
+    e não há limite de recursão
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - order (list): vértices na ordem em que foram descobertos
+        - prev (list): prev[v-1] é o pai do vértice v na árvore da DFS
+        - levels (list): levels[v-1] é a profundidade do vértice v na árvore da DFS
+        (None caso v não seja alcançado a partir de v_1)
+    '''
+    nbrs = _neighbors(g)
+    visited = bytearray(len(g)) # Mapa dos vértices já visitados
+    visited[v_1-1] = 1
     prev = [None] * len(g) # Lista informando o pai de cada vértice
-    layer = 0 # Variável que nos informará em que layer estamos conforme formos entrando e saindo da
-              # função de recursão
+    levels = [None] * len(g) # Lista dos níveis de cada vértice da árvore gerada
+    levels[v_1-1] = 0
+    order = [v_1]
+
+    P = [(v_1, iter(nbrs(v_1)))]
+    while P:
+        v, it = P[-1]
+        # Avançamos para o primeiro vizinho de v ainda não visitado
+        for u in it:
+            if not visited[u-1]:
+                visited[u-1] = 1
+                prev[u-1] = v
+                levels[u-1] = levels[v-1] + 1
+                order.append(u)
+                P.append((u, iter(nbrs(u))))
+                break
+        # Se todos os vizinhos de v já foram visitados, voltamos para o seu pai
+        else:
+            P.pop()
 
-    # Definimos a função de recursão que usaremos para percorrer o grafo
-    def recur_DFS(g, v, visited, layer):
-        visited[v-1] = 1
-        layer += 1
+    return order, prev, levels
 
-        # Caso o grafo seja representado por uma matriz de adjacência
-        if isinstance(g, list):
-            for i in range(len(g)):
-                if g[v-1][i] == 1 and visited[i] == 0:
-                    levels[i][1] = layer
-                    prev[i] = v
-                    recur_DFS(g, i+1, visited, layer)
 
-        # Caso o grafo seja representado por uma lista de adjacência
-        elif isinstance(g, dict):
-            for u in g[v]:
-                if visited[u-1] == 0:
-                    levels[u-1][1] = layer
-                    prev[u-1] = v
-                    recur_DFS(g, u, visited, layer)
+
+def DFS(g, v_1):
+    '''
+    Implementação do algoritmo de busca em profundidade
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - explored (list): lista contendo os vértices do grafo na ordem em que foram
+        explorados (removidos da pilha)
+    '''
+    explored = _dfs(g, v_1)[0]
+    return explored
+
 
 
-    # Chamando então a função para no final termos as listas dos níveis dos vértices e de seus vértices 
-    # pais completas
-    recur_DFS(g, v_1, visited, layer)
+def genTree_DFS(g, v_1, path):
+    '''
+    Cria um novo arquivo texto contendo a árvore gerada pelo algoritmo de busca em
+    profundidade (DFS) a partir do vértice v_1
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+        - path (string): caminho que será usado para criar o arquivo texto contendo
+        as informações da árvore
+    '''
+    order, prev, levels = _dfs(g, v_1)
 
-    # Organizamos a lista de níveis de forma crescente, ou seja, do menor nível para o maior nível
-    levels = sorted(levels, key=itemgetter(1))
+    # Organizamos os vértices alcançados do menor nível para o maior nível e, dentro
+    # de cada nível, em ordem crescente
+    order.sort(key=lambda v: (levels[v-1], v))
 
     # Por fim escrevemos as informações obtidas da árvore no arquivo texto
     with open(path, 'w') as f:
         f.write('Árvore gerada pelo algoritmo de busca em profundidade (DFS) a partir do vértice ' + str(v_1) + ': \n\n')
 
-        for v in levels:
-                f.write('Vértice: ' + str(v[0]+1) + ', Pai: ' + str(prev[v[0]]) + ', Nível: ' + str(v[1]) + '\n')
+        for v in order:
+                f.write('Vértice: ' + str(v) + ', Pai: ' + str(prev[v-1]) + ', Nível: ' + str(levels[v-1]) + '\n')
 
 
 
-def dist(g, v_1, v_2):
+def dist(g, v_1, v_2, hybrid=False):
     '''
     Determina a distância entre dois vértices no grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
         - v_1 (int): Primeiro vértice
         - v_2 (int): Segundo vértice
+        - hybrid (boolean): usa a busca com otimização de direção (top-down/
+        bottom-up) em listas de adjacência e no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
-        - (int): Distância entre o vértice v_1 e v_2
+        - (int): Distância entre o vértice v_1 e v_2 (None caso não exista caminho
+        entre eles)
     '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram explorados
-    visited[v_1-1] = 1
-    levels = [None] * len(g) # Lista dos níveis de cada vértice da árvore gerada 
-    levels[v_1-1] = 0
-    Q = [v_1]
+    levels = _bfs_levels(g, v_1, target=v_2, hybrid=hybrid)[0]
+    return levels[v_2-1]
 
-    layer = 0 # Atual camada na qual estamos buscando os seus vértices
-    cur_layer = [] # Lista em que serão adicionados os vértices correspondendo à camada atual
-    layers = [[v_1]] # Lista contendo os vértices agrupados pelas suas respectivas camadas
-                     # Ex: layers[i] é a lista dos vértices contidos na camada i
 
-    # Caso o grafo seja representado por uma matriz de adjacência
-    if isinstance(g, list):
-        while Q:
-            v = Q.pop(0)
-            for i in range(len(g)):
-                # Encontrando os vértices filhos de v
-                if g[v-1][i] == 1 and visited[i] == 0:
-                    visited[i] = 1
-                    Q.append(i+1)
-
-                for u in layers[layer]:
-                    if g[i][u-1] == 1 and levels[i] == None:
-                        #
-                        if i+1 == v_2:
-                            return layer + 1
-                        levels[i] = layer + 1
-                        cur_layer.append(i+1)
-
-            # Depois teremos todos os vértices da camada atual contidos em cur_layer
-            layers.append(cur_layer)
-            # Caso a camada atual não seja vazia, incrementamos 'layer' para podermos encontrar os 
-            # vértices da próxima camada
-            if cur_layer:
-                layer += 1
-                cur_layer = []
 
-    # Caso o grafo seja representado por uma lista de adjacência
-    elif isinstance(g, dict):
-        while Q:
-            v = Q.pop(0)
-            for u in sorted(g[v]):
-                if u in g[v] and visited[u-1] == 0:
-                    visited[u-1] = 1
-                    Q.append(u)
-
-                for w in layers[layer]:
-                    if u in g[w] and levels[u-1] == None:
-                        if u == v_2:
-                            return layer + 1
-                        levels[u-1] = layer + 1
-                        cur_layer.append(u)
+def last_level(g, v_1, hybrid=False):
+    '''
+    Determina o último nível da árvore gerada pelo algoritmo de busca em largura a
+    partir do vértice v_1
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+        - hybrid (boolean): usa a busca com otimização de direção (top-down/
+        bottom-up) em listas de adjacência e no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - layer (int): Nível da última camada da árvore gerada apartir de v_1 usando
+        a BFS
+    '''
+    layer = _bfs_levels(g, v_1, hybrid=hybrid)[1]
+    return layer
 
-            layers.append(cur_layer)
-            if cur_layer:
-                layer += 1
-                cur_layer = []
 
-    return layers
+
+def _bounding_ecc(g, diameter_only=False, stats=None):
+    '''
+    Calcula as excentricidades exatas dos vértices com o algoritmo de limitação de
+    excentricidades de Takes e Kosters. Cada BFS a partir de um vértice v com
+    excentricidade e dá, para todo w alcançado a uma distância d, os limites
+    max(d, e - d) <= ecc(w) <= e + d. Os vértices cujos limites se encontram não
+    precisam de uma BFS própria, e na prática poucas buscas são necessárias. Os
+    limites só valem em grafos não direcionados: em grafos direcionados é feita
+    uma BFS a partir de cada vértice
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - diameter_only (boolean): se verdadeiro, descarta também os vértices que
+        não podem aumentar o diâmetro, e as excentricidades retornadas podem ser
+        apenas limites inferiores
+        - stats (dict): se dado, recebe o número de buscas feitas ('bfs')
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - ecc (np.ndarray): ecc[v-1] é a excentricidade do vértice v dentro da sua
+        componente conexa
+        - diam (int): diâmetro (maior excentricidade)
+    '''
+    n = _num_vertices(g)
+
+    # Listas de adjacência sem pesos lidas por read_graph são sempre não
+    # direcionadas, por isso apenas um grafo marcado como direcionado usa as BFS
+    # exatas
+    directed = _is_directed(g)
+
+    def bfs(v):
+        # Distâncias a partir de v (-1 para os vértices não alcançados). Fora do
+        # CSR, grafos direcionados usam a BFS top-down, que segue apenas as arestas
+        # de saída
+        if isinstance(_unwrap(g), CSR):
+            return _bfs_hybrid_csr(_unwrap(g), v + 1)[2]
+        levels = _bfs_levels(g, v + 1, hybrid=not directed)[0]
+        return np.array([-1 if l is None else l for l in levels], dtype=np.int64)
+
+    if directed:
+        ecc = np.array([bfs(v).max() for v in range(n)], dtype=np.int64)
+        if stats is not None:
+            stats['bfs'] = n
+        return ecc, int(ecc.max()) if n else 0
+
+    lower = np.zeros(n, dtype=np.int64)
+    upper = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    W = np.ones(n, dtype=bool) # Vértices cuja excentricidade ainda não é conhecida
+    diam = 0
+    bfs_n = 0
+    pick_upper = True
+
+    while W.any():
+        # Alternamos entre o vértice com maior limite superior e o com menor limite
+        # inferior
+        cand = np.flatnonzero(W)
+        if pick_upper:
+            v = cand[np.argmax(upper[cand])]
+        else:
+            v = cand[np.argmin(lower[cand])]
+        pick_upper = not pick_upper
+
+        d = bfs(int(v))
+        e = int(d.max())
+        bfs_n += 1
+        diam = max(diam, e)
+
+        # Atualizando os limites dos vértices alcançados
+        reached = (d >= 0) & W
+        dr = d[reached]
+        lower[reached] = np.maximum(lower[reached], np.maximum(dr, e - dr))
+        upper[reached] = np.minimum(upper[reached], e + dr)
+        lower[v] = upper[v] = e
+
+        W &= lower != upper
+        if diameter_only:
+            W &= upper > diam
+
+    if stats is not None:
+        stats['bfs'] = bfs_n
+    return lower, diam
+
+
+
+def eccentricities(g, stats=None):
+    '''
+    Determina a excentricidade de cada vértice do grafo (dentro da sua componente
+    conexa)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - stats (dict): se dado, recebe o número de buscas em largura feitas ('bfs')
+        quando as excentricidades precisam ser calculadas
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - ecc (list): ecc[v-1] é a excentricidade do vértice v
+    '''
+    ecc = _cached(g, 'eccentricities', lambda g: _bounding_ecc(g, stats=stats)[0])
+    return ecc.tolist()
+
+
+
+def diameter(g, stats=None):
+    '''
+    Determina o diâmetro do grafo 
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - stats (dict): se dado, recebe o número de buscas em largura feitas ('bfs')
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - diam (int): diâmetro
+    '''
+    # Se as excentricidades já foram calculadas, o diâmetro é a maior delas
+    ecc = getattr(g, '_cache', {}).get('eccentricities')
+    if ecc is not None:
+        return int(ecc.max()) if len(ecc) else 0
+    diam = _bounding_ecc(g, diameter_only=True, stats=stats)[1]
+    return diam
+
+
+
+def radius(g):
+    '''
+    Determina o raio do grafo (menor excentricidade entre os seus vértices)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - (int): raio
+    '''
+    return min(eccentricities(g))
+
+
+
+def center(g):
+    '''
+    Determina o centro do grafo (vértices com excentricidade igual ao raio)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - (list): vértices do centro em ordem crescente
+    '''
+    ecc = eccentricities(g)
+    r = min(ecc)
+    return [v+1 for v in range(len(ecc)) if ecc[v] == r]
+
+
+
+def periphery(g):
+    '''
+    Determina a periferia do grafo (vértices com excentricidade igual ao diâmetro)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - (list): vértices da periferia em ordem crescente
+    '''
+    ecc = eccentricities(g)
+    diam = max(ecc)
+    return [v+1 for v in range(len(ecc)) if ecc[v] == diam]
+
+
+
+# Arrays do grafo compartilhados com os processos do pool (preenchido em cada
+# processo por _attach_shared)
+_shared = {}
+
+
+def _share_arrays(arrays):
+    """
+    Copia os arrays para blocos de memória compartilhada, retornando os blocos e a
+    descrição (nome, dtype e tamanho) usada pelos processos para acessá-los
+    """
+    shms, specs = [], []
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        shm = shared_memory.SharedMemory(create=True, size=max(a.nbytes, 1))
+        np.ndarray(a.shape, dtype=a.dtype, buffer=shm.buf)[:] = a
+        shms.append(shm)
+        specs.append((shm.name, a.dtype.str, a.shape))
+    return shms, specs
+
+
+
+def _attach_shared(specs, directed):
+    """
+    Inicializador dos processos do pool: abre os blocos de memória compartilhada
+    e monta o grafo CSR sobre eles, sem copiar os arrays
+    """
+    shms = [shared_memory.SharedMemory(name=name) for name, dtype, shape in specs]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+              for shm, (name, dtype, shape) in zip(shms, specs)]
+    _shared['shms'] = shms # Mantém os blocos abertos enquanto o processo existir
+    _shared['g'] = CSR(arrays[0], arrays[1], arrays[2] if len(arrays) > 2 else None, directed)
+
+
+
+def _bfs_sources(sources, g=None):
+    """
+    Tarefa de cada processo: BFS a partir de cada vértice de sources no grafo
+    compartilhado (ou em g, quando dado), retornando as excentricidades e o
+    histograma de distâncias
+    """
+    if g is None:
+        g = _shared['g']
+    ecc = np.zeros(len(sources), dtype=np.int64)
+    hist = np.zeros(1, dtype=np.int64)
+    for i, s in enumerate(sources):
+        levels = _bfs_hybrid_csr(g, s)[2]
+        ecc[i] = levels.max()
+        h = np.bincount(levels[levels >= 0])
+        if len(h) > len(hist):
+            hist = np.concatenate((hist, np.zeros(len(h) - len(hist), dtype=np.int64)))
+        hist[:len(h)] += h
+    return sources, ecc, hist
+
+
+
+def all_sources_bfs(g, workers=None, sources=None):
+    '''
+    Faz uma BFS a partir de cada vértice do grafo, distribuindo os vértices
+    iniciais entre vários processos. O grafo é compartilhado com os processos
+    através de memória compartilhada, sem cópias
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - workers (int): número de processos (por padrão, o número de núcleos)
+        - sources (list): vértices iniciais (por padrão, todos os vértices)
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - ecc (np.ndarray): ecc[v-1] é a excentricidade do vértice v dentro da sua
+        componente conexa (-1 para os vértices fora de sources)
+        - diam (int): maior excentricidade encontrada
+        - hist (np.ndarray): hist[d] é o número de pares (s, v), com s em sources,
+        a uma distância d um do outro
+    '''
+    g = _to_csr(g)
+    n = len(g)
+    if sources is None:
+        sources = range(1, n+1)
+    sources = list(sources)
+    workers = workers or os.cpu_count() or 1
+
+    ecc = np.full(n, -1, dtype=np.int64)
+    hist = np.zeros(1, dtype=np.int64)
+    # Dividimos os vértices iniciais em alguns blocos por processo, para equilibrar
+    # a carga entre eles
+    k = max(1, len(sources) // (workers * 4))
+    shards = [sources[i:i+k] for i in range(0, len(sources), k)]
+
+    def merge(result):
+        nonlocal hist
+        src, e, h = result
+        ecc[np.array(src, dtype=np.int64) - 1] = e
+        if len(h) > len(hist):
+            hist = np.concatenate((hist, np.zeros(len(h) - len(hist), dtype=np.int64)))
+        hist[:len(h)] += h
+
+    if workers == 1:
+        for shard in shards:
+            merge(_bfs_sources(shard, g))
+    else:
+        shms, specs = _share_arrays([g.indptr, g.indices])
+        try:
+            with multiprocessing.Pool(workers, _attach_shared, (specs, g.directed)) as pool:
+                for result in pool.imap_unordered(_bfs_sources, shards):
+                    merge(result)
+        finally:
+            for shm in shms:
+                shm.close()
+                shm.unlink()
+
+    diam = int(ecc.max()) if n else 0
+    return [ecc, diam, hist]
+
+
+
+class UnionFind:
+    """
+    Estrutura de conjuntos disjuntos (union-find) com compressão de caminhos e
+    união por posto, usada para manter as componentes conexas de um grafo
+    enquanto as suas arestas são adicionadas
+    ------------------------------------------------------------------------------
+    ATRIBUTOS:
+        - parent (list): parent[v-1] é o pai do vértice v na sua árvore
+        - rank (list): posto (limite superior da altura) de cada árvore
+        - count (int): número atual de componentes
+    """
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.rank = [0] * n
+        self.count = n
+
+    def __len__(self):
+        return len(self.parent)
+
+    def find(self, v):
+        """
+        Retorna o representante (1..n) da componente do vértice v
+        """
+        parent = self.parent
+        root = v - 1
+        while parent[root] != root:
+            root = parent[root]
+        # Compressão de caminhos: todos os vértices do caminho apontam para a raiz
+        v = v - 1
+        while parent[v] != root:
+            parent[v], v = root, parent[v]
+        return root + 1
+
+    def union(self, u, v):
+        """
+        Junta as componentes dos vértices u e v (adição da aresta u-v). Retorna True
+        caso as componentes fossem diferentes
+        """
+        ru, rv = self.find(u) - 1, self.find(v) - 1
+        if ru == rv:
+            return False
+        if self.rank[ru] < self.rank[rv]:
+            ru, rv = rv, ru
+        self.parent[rv] = ru
+        if self.rank[ru] == self.rank[rv]:
+            self.rank[ru] += 1
+        self.count -= 1
+        return True
+
+    def add_edges(self, src, dst):
+        """
+        Adiciona as arestas das colunas src e dst (vértices indexados a partir de 0)
+        """
+        find = self.find
+        parent, rank = self.parent, self.rank
+        for u, v in zip(src.tolist(), dst.tolist()):
+            ru, rv = find(u+1) - 1, find(v+1) - 1
+            if ru != rv:
+                if rank[ru] < rank[rv]:
+                    ru, rv = rv, ru
+                parent[rv] = ru
+                if rank[ru] == rank[rv]:
+                    rank[ru] += 1
+                self.count -= 1
+
+    def labels(self):
+        """
+        Retorna o rótulo (0..k-1) da componente de cada vértice, numerando as
+        componentes na ordem do seu menor vértice, e o tamanho de cada componente
+        """
+        roots = np.array([self.find(v) for v in range(1, len(self)+1)], dtype=np.int64)
+        _, first, inverse = np.unique(roots, return_index=True, return_inverse=True)
+        rank = np.empty(len(first), dtype=np.int64)
+        rank[np.argsort(first)] = np.arange(len(first))
+        labels = rank[inverse]
+        return labels, np.bincount(labels, minlength=len(first))
+
+    def components(self):
+        """
+        Retorna as listas (ordenadas) de vértices de cada componente, em ordem
+        decrescente de tamanho
+        """
+        labels, sizes = self.labels()
+        order = np.argsort(labels, kind='stable') + 1
+        C = [c.tolist() for c in np.split(order, np.cumsum(sizes)[:-1])] if len(order) else []
+        return sorted(C, key=len, reverse=True)
+
+
+
+def _edge_columns(g):
+    """
+    Retorna as colunas de arestas (vértices indexados a partir de 0) de um grafo
+    em qualquer representação, com cada aresta como está guardada. Apenas em
+    grafos sabidamente não direcionados cada aresta aparece uma única vez
+    """
+    directed = _is_directed(g)
+    g = _unwrap(g)
+    if isinstance(g, dict):
+        src = np.fromiter((v-1 for v in g for u in g[v]), dtype=np.int64)
+        dst = np.fromiter(((u[0] if isinstance(u, tuple) else u) - 1 for v in g for u in g[v]),
+                          dtype=np.int64, count=len(src))
+    else:
+        c = _to_csr(g)
+        src = np.repeat(np.arange(len(c)), np.diff(c.indptr))
+        dst = np.asarray(c.indices, dtype=np.int64)
+
+    if directed is False:
+        keep = src <= dst
+        src, dst = src[keep], dst[keep]
+    return src, dst
+
+
+
+def _union_find(g):
+    """
+    Monta a estrutura union-find com todas as arestas do grafo
+    """
+    uf = UnionFind(_num_vertices(g))
+    uf.add_edges(*_edge_columns(g))
+    return uf
 
 
 
-def last_level(g, v_1):
+def component_labels(g):
     '''
-    Determina o último nível da árvore gerada pelo algoritmo de busca em largura a
-    partir do vértice v_1
+    Rotula as componentes conexas do grafo com uma estrutura union-find, em tempo
+    praticamente linear no número de arestas
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
-        - v_1 (int): vértice inicial
+        - g (lista, dicionário, CSR ou UnionFind): grafo reprasentado por uma matriz
+        de adjacência, uma lista de adjacência ou no formato CSR, ou a estrutura
+        union-find retornada por read_components
     ------------------------------------------------------------------------------
     SAÍDA:
-        - layer (int): Nível da última camada da árvore gerada apartir de v_1 usando
-        a BFS
+        - labels (np.ndarray): labels[v-1] é o rótulo da componente do vértice v,
+        numeradas na ordem do seu menor vértice
+        - sizes (np.ndarray): sizes[c] é o número de vértices da componente c
     '''
-    visited = [0] * len(g) # Lista informando quais vértices já foram explorados
-    visited[v_1-1] = 1
-    levels = [None] * len(g) # Lista dos níveis de cada vértice da árvore gerada 
-    levels[v_1-1] = 0
-    Q = [v_1]
+    if isinstance(g, Graph):
+        return _cached(g, 'labels', lambda G: component_labels(_cached(G, 'union_find', _union_find)))
+    if not isinstance(g, UnionFind):
+        g = _union_find(g)
+    labels, sizes = g.labels()
+    return [labels, sizes]
 
-    layer = 0 # Atual camada na qual estamos buscando os seus vértices
-    cur_layer = [] # Lista em que serão adicionados os vértices correspondendo à camada atual
-    layers = [[v_1]] # Lista contendo os vértices agrupados pelas suas respectivas camadas
-                     # Ex: layers[i] é a lista dos vértices contidos na camada i
-
-    if isinstance(g, list):
-        while Q:
-            v = Q.pop(0)
-            for i in range(len(g)):
-                # Encontrando os vértices filhos de v
-                if g[v-1][i] == 1 and visited[i] == 0:
-                    visited[i] = 1
-                    Q.append(i+1)
-
-                for u in layers[layer]:
-                    if g[i][u-1] == 1 and levels[i] == None:
-                        levels[i] = layer + 1
-                        cur_layer.append(i+1)
-
-            # Depois teremos todos os vértices da camada atual contidos em cur_layer
-            layers.append(cur_layer)
-            # Caso a camada atual não seja vazia, incrementamos 'layer' para podermos encontrar os 
-            # vértices da próxima camada
-            if cur_layer:
-                layer += 1
-                cur_layer = []
-
-    return layer
 
 
-
-def diameter(g):
+def read_components(path, chunk_size=None):
     '''
-    Determina o diâmetro do grafo 
+    Calcula as componentes conexas diretamente das arestas do arquivo texto, sem
+    construir o grafo. A estrutura union-find retornada pode continuar recebendo
+    arestas (union) e as componentes se mantêm atualizadas
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - path (string): caminho para o arquivo texto do grafo que será lido
+        - chunk_size (int): se dado, o arquivo é lido em blocos de no máximo
+        chunk_size bytes
     ------------------------------------------------------------------------------
     SAÍDA:
-        - diam (int): diâmetro
+        - uf (UnionFind): estrutura union-find com todas as arestas do arquivo
     '''
-    diam = 0
-    cur_diam = 0 # Valor do maior diâmetro achado até o momento
-    
-    if isinstance(g, list):
-        for i in range(len(g)):
-            cur_diam = last_level(g, i+1)
-            if cur_diam > diam:
-                diam = cur_diam
-    return diam
+    if chunk_size:
+        with open(path, 'r') as f:
+            uf = UnionFind(int(f.readline()))
+        for src, dst, w in _iter_edges(path, chunk_size):
+            uf.add_edges(src, dst)
+    else:
+        n, src, dst, w = _read_edges(path)
+        uf = UnionFind(n)
+        uf.add_edges(src, dst)
+    return uf
 
 
 
-def connected(g):
+def connected(g, hybrid=False):
     '''
     Determina as componentes conexas do grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário, CSR ou UnionFind): grafo reprasentado por uma matriz
+        de adjacência, uma lista de adjacência ou no formato CSR, ou a estrutura
+        union-find retornada por read_components
+        - hybrid (boolean): em vez da estrutura union-find, usa uma BFS com
+        otimização de direção (top-down/bottom-up) por componente em listas de
+        adjacência e no formato CSR
     ------------------------------------------------------------------------------
     SAÍDA:
         - C (list): Lista contendo as listas de vértices de cada componente conexa
         do grafo em ordem decrescente de tamanho
     '''
-    C = []
-    G = set([i+1 for i in range(len(g))]) # Contunto de todos os vértices do grafo
+    if isinstance(g, Graph) and not hybrid:
+        return _cached(g, 'components', lambda G: connected(_cached(G, 'union_find', _union_find)))
 
-    # Como a função BFS() retorna todos os vértices que podemos chegar a partir de 
-    # um vértice inicial, BFS(g, 1) nos retornará uma das partes conexas do grafo
-    c = set(BFS(g, 1))
-    # Ordenamos o conjunto de vértices desta parte conexa e adicionamos à C
-    C.append(sorted(c))
-
-    while G:
-        # Iremos subtrair de G os vértices da parte conexa encontrada
-        G = G - c
-        if G:
-            # Enquanto G não estiver vazio usamos o primeiro vértice de G (v) e 
-            # repetimos o mesmo processo
-            v = next(iter(G)) # 
-            c = set(BFS(g, v))
-            C.append(sorted(c))
-
-    return sorted(C, key=len, reverse=True)
+    C = []
 
+    # Na matriz de adjacência, cada componente é a máscara de vértices alcançados
+    # pela busca por fronteiras de bits
+    if isinstance(_unwrap(g), list):
+        g = _unwrap(g)
+        one = bitarray('1')
+        G = bitarray(len(g)) # Máscara dos vértices que ainda não estão em nenhuma componente
+        G.setall(1)
+        v = 0
+        while v != -1:
+            c = _bfs_bits(g, v+1)[2]
+            C.append([u+1 for u in c.search(one)])
+            G &= ~c
+            v = G.find(1)
+        return sorted(C, key=len, reverse=True)
+
+    if hybrid and not isinstance(g, UnionFind):
+        assigned = bytearray(len(g)) # Vértices que já estão em alguma componente
+        for v in range(len(g)):
+            if not assigned[v]:
+                c = sorted(BFS(g, v+1, hybrid))
+                for u in c:
+                    assigned[u-1] = 1
+                C.append(c)
+        return sorted(C, key=len, reverse=True)
+
+    if not isinstance(g, UnionFind):
+        g = _union_find(g)
+    return g.components()
 
 
 
@@ -699,17 +1981,19 @@ def out_graph(g, path):
     Cria um novo arquivo texto contendo informações sobre o grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
         - path (string): caminho que será usado para criar o arquivo texto
     """
     with open(path, 'w') as f:
+        # Todas as estatísticas de grau saem do mesmo vetor de graus
+        stats = degree_stats(g)
         f.write('Número de vértices: ' + str(len(g)) + '\n')
-        f.write('Número de arestas: ' + str(num_edges(g)) + '\n')
-        f.write('Grau mínimo: ' + str(min_degree(g)) + '\n')
-        f.write('Grau máximo: ' + str(max_degree(g)) + '\n')
-        f.write('Grau médio: ' + str(mean_degree(g)) + '\n')
-        f.write('Mediana de grau: ' + str(median_degree(g)) + '\n\n')
+        f.write('Número de arestas: ' + str(stats['edges']) + '\n')
+        f.write('Grau mínimo: ' + str(stats['min']) + '\n')
+        f.write('Grau máximo: ' + str(stats['max']) + '\n')
+        f.write('Grau médio: ' + str(stats['mean']) + '\n')
+        f.write('Mediana de grau: ' + str(stats['median']) + '\n\n')
 
         # Sobre as partes conexas:
         C = connected(g)
@@ -730,53 +2014,82 @@ def dijkstra(g, s):
     e com pesos reais positivos g usando o algoritmo de Dijkstra
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista ou dicionário): grafo reprasentado por uma matriz de adjacência 
-        ou uma lista de adjacência
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
         - s (int): vértice inicial
     ------------------------------------------------------------------------------
     SAÍDA:
-        - dist (list): lista contendo a distância entre o vértice s e cada vértice 
-        do grafo
+        - dist (np.ndarray): array (float64) contendo a distância entre o vértice s
+        e cada vértice do grafo (inf para os vértices não alcançados)
         - parents (list): parents[i] nos informa quem é o pai do vértice i no caminho 
         mínimo do vértice s até o vértice i
     '''
+    g = _unwrap(g)
     s = s-1
     n = len(g)
     INF = float('inf')
 
-    dist = np.array([INF]*n, dtype=np.float16)
-    dist[s] = 0
-    parents = [-1]*n
+    if isinstance(g, dict):
+        n = _num_vertices(g)
 
-    heap = heapdict()
-    for i in range(n):
-        heap[i] = INF
-    heap[s] = 0
+    dist = [INF]*n
+    dist[s] = 0.0
+    parents = [-1]*n
+    done = bytearray(n) # Vértices cuja distância já é definitiva
 
-    # Iplementação usando matriz de adjacência
-    if isinstance(g, list):
-        while heap:
-            u = heap.popitem()[0]
-            for v in range(n):
-                if g[v, u] != INF:
-                    if dist[v] > dist[u] + g[u, v]:
-                        dist[v] = dist[u] + g[u, v]
-                        heap[v] = dist[v]
-                        parents[v] = u
+    # A fila de prioridade contém apenas os vértices já alcançados. Em vez de
+    # atualizar a prioridade de um vértice, inserimos uma nova entrada e
+    # descartamos as entradas antigas quando forem removidas (remoção preguiçosa)
+    heap = [(0.0, s)]
 
     # Iplementação usando lista de adjacência
-    elif isinstance(g, dict):
+    if isinstance(g, dict):
         while heap:
-            u = heap.popitem()[0]
-            if u+1 in g:
-                for v in g[u+1]:
-                    vertex = v[0]-1
-                    if dist[vertex] > dist[u] + v[1] and vertex in heap:
-                        dist[vertex] = dist[u] + v[1]
-                        heap[vertex] = dist[vertex]
-                        parents[vertex] = u
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            for v, w in g.get(u+1, ()):
+                vertex = v-1
+                if not done[vertex] and d + w < dist[vertex]:
+                    dist[vertex] = d + w
+                    parents[vertex] = u
+                    heapq.heappush(heap, (d + w, vertex))
+
+    # Iplementação usando o formato CSR
+    elif isinstance(g, CSR):
+        indptr, indices, weights = g.indptr, g.indices, g.weights
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            a, b = indptr[u], indptr[u+1]
+            # Arestas de um grafo sem pesos têm peso 1, como em _weighted_neighbors
+            w_row = weights[a:b].tolist() if weights is not None else [1.0] * int(b - a)
+            for vertex, w in zip(indices[a:b].tolist(), w_row):
+                if not done[vertex] and d + w < dist[vertex]:
+                    dist[vertex] = d + w
+                    parents[vertex] = u
+                    heapq.heappush(heap, (d + w, vertex))
+
+    # Iplementação usando matriz de adjacência (np.matrix com pesos)
+    else:
+        m = np.asarray(g, dtype=np.float64)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = 1
+            row = m[u]
+            for vertex in np.flatnonzero(np.isfinite(row)).tolist():
+                w = row[vertex]
+                if not done[vertex] and d + w < dist[vertex]:
+                    dist[vertex] = d + w
+                    parents[vertex] = u
+                    heapq.heappush(heap, (d + w, vertex))
 
-    return [dist, parents]
+    return [np.array(dist, dtype=np.float64), parents]
 
 
 
@@ -796,54 +2109,1046 @@ def dijkstra_path(parents, v):
     path = [v]
     parent = parents[v-1]
 
+    # Percorremos o caminho de v até s e o invertemos no final
     while parent != -1:
-        path.insert(0, parent+1)
+        path.append(parent+1)
         parent = parents[parent]
 
+    path.reverse()
+    return path
+
+
+
+def _dijkstra_source(s, g=None):
+    """
+    Tarefa de cada processo: dijkstra a partir de s no grafo compartilhado (ou em
+    g, quando dado). Os pais são devolvidos como array do NumPy, que é enviado de
+    volta ao processo principal bem mais rápido que uma lista
+    """
+    dist, parents = dijkstra(_shared['g'] if g is None else g, s)
+    return s, dist, np.array(parents, dtype=np.int32)
+
+
+
+def dijkstra_many(g, sources, workers=None, window=None):
+    '''
+    Executa dijkstra a partir de cada vértice de sources, distribuindo as origens
+    entre vários processos. O grafo é compartilhado com os processos através de
+    memória compartilhada, sem cópias, e os resultados são devolvidos um a um, de
+    modo que apenas alguns resultados ficam na memória ao mesmo tempo
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR, com pesos reais não
+        negativos
+        - sources (iterável): vértices iniciais
+        - workers (int): número de processos (por padrão, o número de núcleos)
+        - window (int): número máximo de origens em processamento ou aguardando
+        para serem devolvidas (por padrão, 2 por processo)
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - (generator): tuplas (s, dist, parents) na mesma ordem de sources, com
+        dist e parents como em dijkstra (parents como np.ndarray)
+    '''
+    g = _to_csr(g)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for s in sources:
+            yield _dijkstra_source(s, g)
+        return
+
+    window = window or 2 * workers
+    arrays = [g.indptr, g.indices] + ([g.weights] if g.weights is not None else [])
+    shms, specs = _share_arrays(arrays)
+    try:
+        with multiprocessing.Pool(workers, _attach_shared, (specs, g.directed)) as pool:
+            # Mantemos no máximo window origens enviadas aos processos, enviando a
+            # próxima só depois que a mais antiga é devolvida
+            pending = deque()
+            for s in sources:
+                pending.append(pool.apply_async(_dijkstra_source, (s,)))
+                if len(pending) >= window:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+
+
+def _weighted_neighbors(g):
+    '''
+    Retorna uma função que, dado um vértice u (indexado a partir de 0), retorna os
+    pares (vizinho, peso) das arestas que saem de u, com os vizinhos indexados a
+    partir de 0. Arestas de grafos sem pesos têm peso 1
+    '''
+    g = _unwrap(g)
+    if isinstance(g, dict):
+        return lambda u: [(x[0]-1, x[1]) if isinstance(x, tuple) else (x-1, 1.0)
+                          for x in g.get(u+1, ())]
+
+    elif isinstance(g, CSR):
+        indptr, indices, weights = g.indptr, g.indices, g.weights
+        def nbrs(u):
+            a, b = indptr[u], indptr[u+1]
+            w = weights[a:b].tolist() if weights is not None else [1.0] * (b - a)
+            return zip(indices[a:b].tolist(), w)
+        return nbrs
+
+    elif isinstance(g, list) and g and isinstance(g[0], bitarray):
+        one = bitarray('1')
+        return lambda u: [(v, 1.0) for v in g[u].search(one)]
+
+    # Matriz de pesos (np.matrix ou lista de listas), com inf onde não há aresta
+    m = np.asarray(g, dtype=np.float64)
+    def nbrs(u):
+        row = m[u]
+        idx = np.flatnonzero(np.isfinite(row))
+        idx = idx[idx != u]
+        return zip(idx.tolist(), row[idx].tolist())
+    return nbrs
+
+
+
+def _reverse(g, directed=None):
+    '''
+    Retorna o grafo com todas as arestas invertidas, usado pelas buscas que partem
+    do vértice final. Em grafos não direcionados (directed falso, ou CSR e Graph
+    não direcionados) é o próprio grafo. Nos demais a transposta fica guardada no
+    objeto do grafo quando possível (CSR e Graph), e em um dicionário sem a
+    direção conhecida é montada a cada chamada
+    '''
+    if _is_directed(g, directed) is False:
+        return g
+    return _cached(g, 'reverse', _transpose)
+
+
+
+def _transpose(g):
+    '''
+    Monta, no formato CSR, o grafo com todas as arestas invertidas
+    '''
+    c = _to_csr(g)
+    n = len(c)
+    src = np.repeat(np.arange(n), np.diff(c.indptr))
+    return _build_csr(n, np.asarray(c.indices, dtype=np.int64), src, c.weights, directed=True)
+
+
+
+def _path(parents, v):
+    '''
+    Reconstrói o caminho até v (indexado a partir de 0) a partir do dicionário
+    parents de uma busca, retornando os vértices indexados a partir de 1
+    '''
+    path = []
+    while v != -1:
+        path.append(v+1)
+        v = parents[v]
+    path.reverse()
     return path
 
 
 
-def floyd_warshall(g):
+def shortest_path(g, s, t, bidirectional=False, stats=None, directed=None):
+    '''
+    Calcula o caminho mínimo de s até t com o algoritmo de Dijkstra, encerrando a
+    busca assim que t tem a sua distância definida. Apenas os vértices alcançados
+    pela busca são guardados
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR, com pesos reais não
+        negativos
+        - s (int): vértice inicial
+        - t (int): vértice final
+        - bidirectional (boolean): faz ao mesmo tempo uma busca a partir de s e uma
+        a partir de t no grafo com as arestas invertidas, até que as duas se
+        encontrem
+        - stats (dict): se dado, recebe o número de vértices com distância definida
+        ('settled')
+        - directed (boolean): indica se o grafo é direcionado. Por padrão é lido de
+        um CSR ou Graph; em um dicionário ou matriz sem essa informação, a busca
+        bidirecional monta a cada chamada o grafo com as arestas invertidas
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - d (float): distância de s até t (inf caso não exista caminho)
+        - path (list): caminho mínimo de s até t (vazio caso não exista caminho)
+    '''
+    if bidirectional:
+        return _bidirectional_dijkstra(g, s, t, stats, directed)
+
+    nbrs = _weighted_neighbors(g)
+    s, t = s-1, t-1
+    dist = {s: 0.0}
+    parents = {s: -1}
+    done = set()
+
+    heap = [(0.0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        if u == t:
+            break
+        for v, w in nbrs(u):
+            if v not in done and d + w < dist.get(v, float('inf')):
+                dist[v] = d + w
+                parents[v] = u
+                heapq.heappush(heap, (d + w, v))
+
+    if stats is not None:
+        stats['settled'] = len(done)
+    if t not in done:
+        return [float('inf'), []]
+    return [dist[t], _path(parents, t)]
+
+
+
+def _bidirectional_dijkstra(g, s, t, stats=None, directed=None):
+    '''
+    Dijkstra bidirecional usado por shortest_path. A cada passo avançamos a busca
+    cuja fila tem a menor distância, e paramos quando a soma dos topos das duas
+    filas não pode mais melhorar o melhor caminho encontrado (mu)
+    '''
+    nbrs = (_weighted_neighbors(g), _weighted_neighbors(_reverse(g, directed)))
+    s, t = s-1, t-1
+    dist = ({s: 0.0}, {t: 0.0})
+    parents = ({s: -1}, {t: -1})
+    done = (set(), set())
+    heaps = ([(0.0, s)], [(0.0, t)])
+
+    mu = float('inf') # Melhor distância encontrada até agora
+    best = None # Aresta (lado, u, v) que liga as duas buscas no melhor caminho
+    if s == t:
+        mu, best = 0.0, (0, s, -1)
+
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < mu:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        d, u = heapq.heappop(heaps[side])
+        if u in done[side]:
+            continue
+        done[side].add(u)
+
+        D, P, other = dist[side], parents[side], dist[1-side]
+        for v, w in nbrs[side](u):
+            if v not in done[side] and d + w < D.get(v, float('inf')):
+                D[v] = d + w
+                P[v] = u
+                heapq.heappush(heaps[side], (d + w, v))
+            # Caminho passando pela aresta u-v, que liga as duas buscas
+            if v in other and d + w + other[v] < mu:
+                mu = d + w + other[v]
+                best = (side, u, v)
+
+    if stats is not None:
+        stats['settled'] = len(done[0]) + len(done[1])
+    if best is None:
+        return [float('inf'), []]
+
+    # Juntando o caminho de s até a aresta com o caminho da aresta até t
+    side, u, v = best
+    if side == 1:
+        u, v = v, u
+    path = _path(parents[0], u)
+    if v != -1:
+        path += _path(parents[1], v)[::-1]
+    return [mu, path]
+
+
+
+def read_coords(path):
+    '''
+    Lê o arquivo com as coordenadas dos vértices, no mesmo formato dos arquivos
+    dos grafos: a primeira linha tem o número de vértices e cada linha seguinte
+    tem um vértice e as suas coordenadas ("v x y")
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - path (string): caminho para o arquivo texto das coordenadas
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - coords (np.ndarray): coords[v-1] são as coordenadas do vértice v
+    '''
+    with open(path, 'r') as f:
+        n = int(f.readline())
+        data = np.loadtxt(f, dtype=np.float64, ndmin=2)
+    coords = np.full((n, data.shape[1] - 1), np.nan)
+    coords[data[:, 0].astype(np.int64) - 1] = data[:, 1:]
+    return coords
+
+
+
+def euclidean(coords, scale=1.0):
+    '''
+    Heurística da distância em linha reta para astar. É admissível sempre que o
+    peso de cada aresta for pelo menos scale vezes o comprimento do segmento
+    entre os seus vértices
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - coords (np.ndarray): coordenadas dos vértices (read_coords)
+        - scale (float): fator que multiplica a distância em linha reta
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - h (function): h(v, t) é a estimativa da distância de v até t
+    '''
+    xy = (np.asarray(coords, dtype=np.float64) * scale).tolist()
+    def h(v, t):
+        a, b = xy[v-1], xy[t-1]
+        return sum((x - y) ** 2 for x, y in zip(a, b)) ** 0.5
+    return h
+
+
+
+def landmark_heuristic(from_dist, to_dist=None):
+    '''
+    Heurística dos marcos (landmarks) para astar, usando a desigualdade
+    triangular: para um marco L, d(v, t) >= d(L, t) - d(L, v) e
+    d(v, t) >= d(v, L) - d(t, L)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - from_dist (np.ndarray): from_dist[i, v-1] é a distância do i-ésimo marco
+        até v (dijkstra a partir do marco)
+        - to_dist (np.ndarray): to_dist[i, v-1] é a distância de v até o i-ésimo
+        marco. Por padrão (grafos não direcionados) é igual a from_dist
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - h (function): h(v, t) é a estimativa da distância de v até t
+    '''
+    D_from = np.atleast_2d(np.asarray(from_dist, dtype=np.float64))
+    D_to = D_from if to_dist is None else np.atleast_2d(np.asarray(to_dist, dtype=np.float64))
+    # Colunas por vértice, para que cada consulta leia apenas os k valores de v e t
+    cols_from = D_from.T.tolist()
+    cols_to = cols_from if to_dist is None else D_to.T.tolist()
+    INF = float('inf')
+
+    def h(v, t):
+        best = 0.0
+        for lv, lt, vl, tl in zip(cols_from[v-1], cols_from[t-1], cols_to[v-1], cols_to[t-1]):
+            # Marcos que não alcançam algum dos dois vértices não dão limite
+            if lt < INF and lv < INF and lt - lv > best:
+                best = lt - lv
+            if vl < INF and tl < INF and vl - tl > best:
+                best = vl - tl
+        return best
+    return h
+
+
+
+def astar(g, s, t, h=None, stats=None):
+    '''
+    Calcula o caminho mínimo de s até t com o algoritmo A*, que ordena a fila de
+    prioridade pela distância já percorrida mais a estimativa h da distância
+    restante até t. Com uma heurística consistente (euclidean, landmark_heuristic)
+    o resultado é o mesmo de dijkstra, definindo bem menos vértices
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR, com pesos reais não
+        negativos
+        - s (int): vértice inicial
+        - t (int): vértice final
+        - h (function): h(v, t) estima a distância de v até t sem superestimá-la.
+        Sem h, a busca é igual a shortest_path
+        - stats (dict): se dado, recebe o número de vértices com distância definida
+        ('settled')
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - d (float): distância de s até t (inf caso não exista caminho)
+        - path (list): caminho mínimo de s até t (vazio caso não exista caminho)
+    '''
+    if h is None:
+        return shortest_path(g, s, t, stats=stats)
+
+    nbrs = _weighted_neighbors(g)
+    s, t = s-1, t-1
+    dist = {s: 0.0}
+    parents = {s: -1}
+    est = {} # Estimativa h de cada vértice alcançado, calculada uma única vez
+    done = set()
+
+    heap = [(h(s+1, t+1), s)]
+    while heap:
+        u = heapq.heappop(heap)[1]
+        if u in done:
+            continue
+        done.add(u)
+        if u == t:
+            break
+        d = dist[u]
+        for v, w in nbrs(u):
+            if v not in done and d + w < dist.get(v, float('inf')):
+                dist[v] = d + w
+                parents[v] = u
+                if v not in est:
+                    est[v] = h(v+1, t+1)
+                heapq.heappush(heap, (d + w + est[v], v))
+
+    if stats is not None:
+        stats['settled'] = len(done)
+    if t not in done:
+        return [float('inf'), []]
+    return [dist[t], _path(parents, t)]
+
+
+
+class Landmarks:
+    """
+    Índice de marcos (landmarks) para consultas repetidas de caminho mínimo no
+    mesmo grafo (ALT: A*, marcos e desigualdade triangular). Guarda as distâncias
+    de cada marco até todos os vértices (e de todos os vértices até cada marco, em
+    grafos direcionados), que dão limites inferiores para o A* e estimativas
+    rápidas das distâncias
+    ------------------------------------------------------------------------------
+    ATRIBUTOS:
+        - marks (np.ndarray): vértices escolhidos como marcos
+        - from_dist (np.ndarray): from_dist[i, v-1] é a distância de marks[i] até v
+        - to_dist (np.ndarray ou None): to_dist[i, v-1] é a distância de v até
+        marks[i] (None em grafos não direcionados, em que é igual a from_dist)
+        - stats (dict): custo do pré-processamento, em segundos ('time') e em
+        número de execuções de dijkstra ('dijkstra')
+    """
+    def __init__(self, marks, from_dist, to_dist=None, stats=None):
+        self.marks = np.asarray(marks, dtype=np.int64)
+        self.from_dist = from_dist
+        self.to_dist = to_dist
+        self.stats = stats if stats is not None else {}
+        self._h = None
+
+    def __len__(self):
+        return len(self.marks)
+
+    def heuristic(self):
+        """
+        Retorna a heurística h(v, t) dos marcos, usada por query e astar
+        """
+        if self._h is None:
+            self._h = landmark_heuristic(self.from_dist, self.to_dist)
+        return self._h
+
+    def bounds(self, s, t):
+        """
+        Retorna os limites inferior e superior da distância de s até t dados pelos
+        marcos, sem nenhuma busca no grafo
+        """
+        F = self.from_dist
+        T = F if self.to_dist is None else self.to_dist
+        with np.errstate(invalid='ignore'):
+            lower = np.concatenate((F[:, t-1] - F[:, s-1], T[:, s-1] - T[:, t-1]))
+        lower = lower[np.isfinite(lower)]
+        upper = (T[:, s-1] + F[:, t-1]).min() if len(self) else float('inf')
+        return [max(0.0, float(lower.max())) if len(lower) else 0.0, float(upper)]
+
+    def approx(self, s, t):
+        """
+        Estimativa rápida da distância de s até t: o menor caminho que passa por
+        algum marco, d(s, L) + d(L, t)
+        """
+        return self.bounds(s, t)[1]
+
+    def query(self, g, s, t, stats=None):
+        """
+        Caminho mínimo exato de s até t com A* guiado pelos marcos (ALT). Retorna a
+        distância e o caminho, como astar
+        """
+        return astar(g, s, t, self.heuristic(), stats)
+
+    def save(self, path):
+        """
+        Grava o índice em path (arquivo .npz do NumPy)
+        """
+        with open(path, 'wb') as f:
+            np.savez(f, marks=self.marks, from_dist=self.from_dist,
+                     to_dist=self.to_dist if self.to_dist is not None else np.empty((0, 0)),
+                     time=self.stats.get('time', 0.0), dijkstra=self.stats.get('dijkstra', 0))
+
+
+
+def load_landmarks(path):
+    '''
+    Lê o índice de marcos gravado por Landmarks.save
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - path (string): caminho para o arquivo do índice
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - L (Landmarks): índice de marcos
+    '''
+    with np.load(path) as data:
+        to_dist = data['to_dist'] if data['to_dist'].size else None
+        stats = {'time': float(data['time']), 'dijkstra': int(data['dijkstra'])}
+        return Landmarks(data['marks'], data['from_dist'], to_dist, stats)
+
+
+
+def _avoid_landmark(g, F, T, marks, rng):
+    '''
+    Escolhe o próximo marco pelo método avoid: a partir de um vértice r ao acaso,
+    cada vértice v da árvore de caminhos mínimos recebe o peso d(r, v) menos o
+    limite inferior dado pelos marcos atuais, e descemos pela árvore sempre para
+    o filho cuja subárvore (sem nenhum marco) tem a maior soma de pesos, até uma
+    folha. Assim o novo marco fica em uma região mal coberta pelos marcos atuais
+    '''
+    n = F.shape[1]
+    r = int(rng.integers(n))
+    d, parents = dijkstra(g, r+1)
+    reached = np.isfinite(d)
+
+    # Limite inferior de d(r, v) dado pelos marcos atuais
+    lower = np.zeros(n)
+    if len(F):
+        with np.errstate(invalid='ignore'):
+            b = np.concatenate((F - F[:, [r]], T[:, [r]] - T))
+        b[~np.isfinite(b)] = 0
+        lower = np.maximum(b.max(axis=0), 0)
+    weight = np.where(reached, d - lower, 0).tolist()
+
+    # Filhos de cada vértice na árvore e ordem da raiz para as folhas
+    children = [[] for _ in range(n)]
+    for v, p in enumerate(parents):
+        if p != -1:
+            children[p].append(v)
+    order = [r]
+    for v in order:
+        order.extend(children[v])
+
+    # Soma dos pesos de cada subárvore, zerada nas subárvores que contêm um marco
+    size = weight
+    has_mark = [False] * n
+    for L in marks:
+        has_mark[L] = True
+    for v in reversed(order):
+        p = parents[v]
+        if has_mark[v]:
+            size[v] = 0
+        if p != -1:
+            has_mark[p] = has_mark[p] or has_mark[v]
+            if not has_mark[v]:
+                size[p] += size[v]
+
+    v = r
+    while children[v]:
+        v = max(children[v], key=lambda u: size[u])
+    return v
+
+
+
+def landmarks(g, k=8, method='farthest', seed=0, directed=None):
+    '''
+    Pré-processamento ALT: escolhe k marcos e calcula, com dijkstra, as distâncias
+    de cada marco até todos os vértices (e no grafo com as arestas invertidas, em
+    grafos direcionados)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR, com pesos reais não
+        negativos
+        - k (int): número de marcos
+        - method (string): 'farthest' (cada marco é o vértice mais distante dos
+        marcos já escolhidos), 'avoid' (marcos nas regiões em que os limites
+        inferiores atuais são piores) ou 'random'
+        - seed (int): semente dos sorteios
+        - directed (boolean): indica se o grafo é direcionado. Por padrão é lido de
+        um CSR ou Graph; é obrigatório para um dicionário ou matriz com pesos
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - L (Landmarks): índice de marcos, com o custo do pré-processamento em
+        L.stats
+    '''
+    directed = _is_directed(g, directed)
+    if directed is None:
+        # Tratar um grafo direcionado como não direcionado tornaria a heurística
+        # não admissível, e as consultas retornariam distâncias erradas
+        raise ValueError('landmarks: informe directed para um grafo em dicionário ou matriz')
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n = _num_vertices(g)
+    R = _reverse(g, directed) if directed else None
+    runs = 0
+
+    marks = []
+    F = np.empty((0, n))
+    T = np.empty((0, n))
+    if method == 'random':
+        marks = (rng.choice(n, size=min(k, n), replace=False)).tolist()
+    for i in range(min(k, n)):
+        if method == 'farthest':
+            if not marks:
+                # O primeiro marco é o vértice mais distante de um vértice ao acaso
+                d = dijkstra(g, int(rng.integers(n)) + 1)[0]
+                runs += 1
+                score = np.where(np.isfinite(d), d, -1)
+            else:
+                # Vértice mais distante dos marcos já escolhidos (vértices em
+                # componentes sem marco têm distância infinita)
+                score = F.min(axis=0)
+                score[marks] = -1
+            v = int(np.argmax(score))
+        elif method == 'avoid':
+            v = _avoid_landmark(g, F, T, marks, rng)
+            runs += 1
+        else:
+            v = marks[i]
+        if method != 'random':
+            marks.append(v)
+
+        F = np.vstack((F, dijkstra(g, v+1)[0][:n]))
+        T = np.vstack((T, dijkstra(R, v+1)[0][:n])) if directed else F
+        runs += 2 if directed else 1
+
+    stats = {'time': time.perf_counter() - start, 'dijkstra': runs}
+    return Landmarks(np.array(marks, dtype=np.int64) + 1, F, T if directed else None, stats)
+
+
+
+def _dense(g, dtype=np.float64):
+    '''
+    Matriz de distâncias diretas (n x n) do grafo: o peso da aresta, 0 na diagonal
+    e inf entre vértices não adjacentes. Entre arestas paralelas fica a de menor
+    peso
+    '''
+    g = _unwrap(g)
+    if not isinstance(g, (list, dict, CSR)):
+        d = np.array(g, dtype=dtype)
+        np.fill_diagonal(d, np.minimum(np.diagonal(d), 0))
+        return d
+    c = _to_csr(g)
+    n = len(c)
+    d = np.full((n, n), np.inf, dtype=dtype)
+    src = np.repeat(np.arange(n), np.diff(c.indptr))
+    w = c.weights if c.weights is not None else np.ones(len(src))
+    np.minimum.at(d, (src, np.asarray(c.indices, dtype=np.int64)), w.astype(dtype))
+    np.fill_diagonal(d, np.minimum(np.diagonal(d), 0))
+    return d
+
+
+
+def _fw_relax(D, P, C, R, PR):
+    '''
+    Relaxa o bloco D da matriz de distâncias (com os pais P) passando por cada
+    vértice k de um bloco K, com uma operação do NumPy por k: C = d[I, K],
+    R = d[K, J] e PR = prev[K, J]. Os blocos podem ser vistas da mesma matriz
+    '''
+    for k in range(C.shape[1]):
+        alt = C[:, k, None] + R[None, k, :]
+        mask = alt < D
+        np.copyto(D, alt, where=mask)
+        np.copyto(P, PR[k], where=mask)
+
+
+
+def floyd_warshall(g, dtype=np.float64, block=None):
     '''
     Calcula a distância entre todos os vértices de um grafo direcionado com pesos
-    reais g usando o algoritmo de Floyd-Warshall
+    reais g usando o algoritmo de Floyd-Warshall. A relaxação por cada vértice k é
+    feita de uma vez sobre toda a matriz com o NumPy
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g (lista): grafo reprasentado por uma matriz de adjacência
+        - g (np.matrix, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência com pesos, uma lista de adjacência ou no formato CSR
+        - dtype (np.dtype): tipo das distâncias (np.float64 ou np.float32)
+        - block (int): se dado, usa a versão em blocos de block x block vértices,
+        em que cada bloco é relaxado enquanto está na memória cache (mais rápida
+        para n grande)
     ------------------------------------------------------------------------------
     SAÍDA:
-        - d (list): matriz que em d[i, j] nos informa a distância entre os vértices
-        i e j
-        - prev (list): prev[i, j] nos informa quem é o pai do vértice j no caminho
-        mínimo de i para j
+        - d (np.ndarray): matriz que em d[i, j] nos informa a distância entre os
+        vértices i e j
+        - prev (np.ndarray): prev[i, j] nos informa quem é o pai do vértice j no
+        caminho mínimo de i para j
     '''
-    n = len(g)
+    d = _dense(g, dtype)
+    n = len(d)
+    prev = np.where(np.isfinite(d), np.arange(n, dtype=np.int32)[:, None], -1).astype(np.int32)
+    np.fill_diagonal(prev, -1)
+
+    if block is None:
+        blocks = [slice(0, n)]
+    else:
+        blocks = [slice(a, min(a + block, n)) for a in range(0, n, block)]
+
+    for K in blocks:
+        # Bloco da diagonal, depois os blocos da linha e da coluna de K e, por
+        # fim, os demais blocos, que só dependem dos blocos da linha e da coluna
+        _fw_relax(d[K, K], prev[K, K], d[K, K], d[K, K], prev[K, K])
+        for J in blocks:
+            if J != K:
+                _fw_relax(d[K, J], prev[K, J], d[K, K], d[K, J], prev[K, J])
+                _fw_relax(d[J, K], prev[J, K], d[J, K], d[K, K], prev[K, K])
+        for I in blocks:
+            if I != K:
+                for J in blocks:
+                    if J != K:
+                        _fw_relax(d[I, J], prev[I, J], d[I, K], d[K, J], prev[K, J])
+
+        if (np.diagonal(d) < 0).any():
+            print('\n-> Grafo contem ciclo negativo <-\n')
+            return [None, None]
+
+    return [d, prev]
+
+
+
+def _edge_arrays(g):
+    '''
+    Colunas (origem, destino, peso) de todas as arestas do grafo guardadas no
+    formato CSR, com os vértices indexados a partir de 0
+    '''
+    c = _to_csr(g)
+    src = np.repeat(np.arange(len(c)), np.diff(c.indptr))
+    w = c.weights if c.weights is not None else np.ones(len(src))
+    return c, src, np.asarray(c.indices, dtype=np.int64), np.asarray(w, dtype=np.float64)
+
+
+
+def _relax_rounds(dist, parents, src, dst, w, rounds):
+    '''
+    Rodadas de Bellman-Ford: em cada rodada todas as arestas são relaxadas de uma
+    vez com o NumPy, a partir das distâncias da rodada anterior. Para assim que
+    nenhuma distância muda, retornando o número de rodadas feitas, ou None caso as
+    distâncias ainda mudem após rounds rodadas (ciclo negativo)
+    '''
+    for r in range(rounds):
+        cand = dist[src] + w
+        e = np.flatnonzero(cand < dist[dst])
+        if not len(e):
+            return r
+        new = dist.copy()
+        np.minimum.at(new, dst[e], cand[e])
+        # O pai de cada vértice melhorado é a origem de uma aresta que dá o mínimo
+        win = e[cand[e] == new[dst[e]]]
+        parents[dst[win]] = src[win]
+        dist[:] = new
+    return None
+
+
+
+def bellman_ford(g, s, spfa=False, stats=None):
+    '''
+    Calcula a distância entre s e todos os outros vértices de um grafo direcionado
+    com pesos reais (inclusive negativos) usando o algoritmo de Bellman-Ford. Em
+    cada rodada todas as arestas são relaxadas de uma vez com o NumPy, e a busca
+    termina na primeira rodada em que nenhuma distância muda
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - s (int): vértice inicial
+        - spfa (boolean): usa a fila do SPFA, que relaxa apenas as arestas dos
+        vértices cuja distância mudou (melhor quando poucas distâncias mudam a
+        cada rodada)
+        - stats (dict): se dado, recebe o número de rodadas ('rounds') ou, com
+        spfa, de vértices removidos da fila ('pops')
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - dist (np.ndarray): array (float64) contendo a distância entre o vértice s
+        e cada vértice do grafo (inf para os vértices não alcançados)
+        - parents (list): parents[i] nos informa quem é o pai do vértice i no caminho
+        mínimo do vértice s até o vértice i (como em dijkstra, para dijkstra_path)
+    '''
+    if spfa:
+        return _spfa(g, s, stats)
+
+    c, src, dst, w = _edge_arrays(g)
+    n = len(c)
+    dist = np.full(n, np.inf)
+    dist[s-1] = 0
+    parents = np.full(n, -1, dtype=np.int64)
+
+    rounds = _relax_rounds(dist, parents, src, dst, w, n)
+    if stats is not None:
+        stats['rounds'] = rounds if rounds is not None else n
+    if rounds is None:
+        print('\n-> Grafo contem ciclo negativo <-\n')
+        return [None, None]
+    return [dist, parents.tolist()]
+
+
+
+def _spfa(g, s, stats=None):
+    '''
+    Bellman-Ford com fila (SPFA), usado por bellman_ford: apenas os vértices cuja
+    distância diminuiu voltam para a fila. Um vértice que entra na fila n vezes
+    indica um ciclo negativo alcançável a partir de s
+    '''
+    nbrs = _weighted_neighbors(g)
+    n = _num_vertices(g)
     INF = float('inf')
-    prev = np.matrix([[-1]*n]*n, dtype=np.int)
-    d = g.copy()
-
-    for i in range(n):
-        for j in range(n):
-            if i != j and g[i, j] != INF:
-                prev[i, j] = i
-
-    for k in range(n):
-        for i in range(n):
-            if d[i, k] != float('inf'):
-                for j in range(n):
-                    if d[k, j] != float('inf'):
-                        if d[i, j] > d[i, k] + d[k, j]:
-                            if i == j and d[i, k] + d[k, j] < 0:
-                                print('\n-> Grafo contem ciclo negativo <-\n')
-                                return [None, None]
-                            d[i, j] = d[i, k] + d[k, j]
-                            prev[i, j] = prev[k, j]
+    dist = [INF] * n
+    dist[s-1] = 0.0
+    parents = [-1] * n
+    in_queue = bytearray(n)
+    count = [0] * n # Número de vezes que cada vértice entrou na fila
+
+    Q = deque([s-1])
+    in_queue[s-1] = 1
+    count[s-1] = 1
+    pops = 0
+    while Q:
+        u = Q.popleft()
+        in_queue[u] = 0
+        pops += 1
+        d = dist[u]
+        for v, w in nbrs(u):
+            if d + w < dist[v]:
+                dist[v] = d + w
+                parents[v] = u
+                if not in_queue[v]:
+                    count[v] += 1
+                    # Sem ciclos negativos, cada vértice entra na fila no máximo uma
+                    # vez por rodada de Bellman-Ford, ou seja, menos de n vezes
+                    if count[v] >= n:
+                        if stats is not None:
+                            stats['pops'] = pops
+                        print('\n-> Grafo contem ciclo negativo <-\n')
+                        return [None, None]
+                    Q.append(v)
+                    in_queue[v] = 1
+
+    if stats is not None:
+        stats['pops'] = pops
+    return [np.array(dist, dtype=np.float64), parents]
+
+
+
+def _johnson_stream(c, h, sources, workers):
+    '''
+    Dijkstra no grafo com os pesos ajustados a partir de cada origem, desfazendo o
+    ajuste nas distâncias: d(s, v) = d'(s, v) - h(s) + h(v)
+    '''
+    for s, dist, parents in dijkstra_many(c, sources, workers):
+        yield s, dist - h[s-1] + h, parents
+
 
+
+def johnson(g, workers=None, stream=False, sources=None):
+    '''
+    Calcula a distância entre todos os vértices de um grafo direcionado com pesos
+    reais (inclusive negativos) usando o algoritmo de Johnson: uma passada de
+    Bellman-Ford calcula potenciais h que tornam todos os pesos não negativos
+    (w'(u, v) = w(u, v) + h(u) - h(v)) e, em seguida, dijkstra é executado a partir
+    de cada vértice, em paralelo. Em grafos esparsos é bem mais rápido que
+    floyd_warshall e não precisa da matriz de adjacência
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (lista, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência, uma lista de adjacência ou no formato CSR
+        - workers (int): número de processos usados nas execuções de dijkstra
+        (por padrão, o número de núcleos)
+        - stream (boolean): em vez das matrizes, retorna um gerador que devolve
+        (s, dist, parents) para cada origem, com memória limitada
+        - sources (iterável): origens (por padrão, todos os vértices)
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - d (np.ndarray): matriz que em d[i, j] nos informa a distância entre os
+        vértices i e j
+        - prev (np.ndarray): prev[i, j] nos informa quem é o pai do vértice j no
+        caminho mínimo de i para j
+        ou, com stream
+        - (generator): tuplas (s, dist, parents) como em dijkstra_many
+    '''
+    c, src, dst, w = _edge_arrays(g)
+    n = len(c)
+
+    # Bellman-Ford a partir de um vértice auxiliar ligado a todos os vértices com
+    # peso 0, o que equivale a começar com todas as distâncias iguais a 0
+    h = np.zeros(n)
+    if _relax_rounds(h, np.full(n, -1), src, dst, w, n) is None:
+        print('\n-> Grafo contem ciclo negativo <-\n')
+        return [None, None]
+
+    # Pesos ajustados, todos não negativos (arredondamos para 0 os erros de ponto
+    # flutuante)
+    w = np.maximum(w + h[src] - h[dst], 0)
+    c = CSR(c.indptr, c.indices, w, directed=True)
+
+    sources = range(1, n+1) if sources is None else sources
+    if stream:
+        return _johnson_stream(c, h, sources, workers)
+
+    sources = list(sources)
+    d = np.empty((len(sources), n))
+    prev = np.empty((len(sources), n), dtype=np.int32)
+    for i, (s, dist, parents) in enumerate(_johnson_stream(c, h, sources, workers)):
+        d[i] = dist
+        prev[i] = parents
     return [d, prev]
 
 
 
+def _index_dtype(n):
+    '''
+    Menor tipo inteiro com sinal capaz de guardar os vértices 0..n-1 e o valor -1
+    '''
+    for dtype in (np.int8, np.int16, np.int32):
+        if n - 1 <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+
+class APSP:
+    """
+    Resultado dos caminhos mínimos entre todos os pares de vértices, com os pais
+    guardados no menor tipo inteiro suficiente. As matrizes podem ser gravadas em
+    disco e abertas com numpy.memmap (load_apsp), de modo que as consultas leem
+    apenas as linhas necessárias
+    ------------------------------------------------------------------------------
+    ATRIBUTOS:
+        - d (np.ndarray ou None): d[i-1, j-1] é a distância de i até j
+        - prev (np.ndarray): prev[i-1, j-1] é o pai de j (indexado a partir de 0)
+        no caminho mínimo de i até j, ou -1
+    """
+    def __init__(self, d, prev):
+        self.d = d
+        dtype = _index_dtype(len(prev))
+        self.prev = prev if prev.dtype == dtype else prev.astype(dtype)
+
+    def __len__(self):
+        return len(self.prev)
+
+    def distance(self, s, t):
+        """
+        Distância de s até t
+        """
+        return float(self.d[s-1, t-1])
+
+    def path(self, s, t):
+        """
+        Caminho mínimo de s até t (vazio caso não exista caminho), em tempo linear
+        no tamanho do caminho
+        """
+        row = self.prev[s-1]
+        path = [t]
+        u = t-1
+        while u != s-1:
+            u = int(row[u])
+            if u == -1:
+                return []
+            path.append(u+1)
+        path.reverse()
+        return path
+
+    def paths(self, sources, targets):
+        """
+        Caminhos mínimos de sources[i] até targets[i] para todos os pares ao mesmo
+        tempo. Os caminhos são seguidos em paralelo com o NumPy, um passo por vez,
+        e devolvidos concatenados: o i-ésimo caminho é
+        flat[offsets[i]:offsets[i+1]] (vazio caso não exista caminho)
+        """
+        s = np.asarray(sources, dtype=np.int64) - 1
+        cur = np.asarray(targets, dtype=np.int64) - 1
+        q = len(s)
+
+        # steps[k][i] é o k-ésimo vértice do caminho i, partindo do final
+        steps = [cur]
+        lengths = np.ones(q, dtype=np.int64)
+        active = cur != s
+        while active.any():
+            idx = np.flatnonzero(active)
+            nxt = cur.copy()
+            nxt[idx] = self.prev[s[idx], cur[idx]]
+            # Pares sem caminho ficam com comprimento 0
+            lost = idx[nxt[idx] == -1]
+            lengths[lost] = 0
+            active[lost] = False
+            ok = idx[nxt[idx] != -1]
+            lengths[ok] += 1
+            nxt[lost] = cur[lost]
+            cur = nxt
+            active &= cur != s
+            steps.append(cur)
+
+        offsets = np.zeros(q + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        M = np.stack(steps)
+        query = np.repeat(np.arange(q), lengths)
+        k = np.arange(offsets[-1]) - offsets[query]
+        flat = M[lengths[query] - 1 - k, query] + 1
+        return [flat, offsets]
+
+    def save(self, path):
+        """
+        Grava as matrizes em path + '.dist.npy' e path + '.prev.npy'
+        """
+        if self.d is not None:
+            np.save(path + '.dist.npy', self.d)
+        np.save(path + '.prev.npy', self.prev)
+
+
+
+def load_apsp(path, mmap=True):
+    '''
+    Abre o resultado gravado por APSP.save
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - path (string): caminho usado em APSP.save
+        - mmap (boolean): abre as matrizes com numpy.memmap, sem lê-las para a
+        memória
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - r (APSP): caminhos mínimos entre todos os pares
+    '''
+    mode = 'r' if mmap else None
+    d = np.load(path + '.dist.npy', mmap_mode=mode) if os.path.exists(path + '.dist.npy') else None
+    return APSP(d, np.load(path + '.prev.npy', mmap_mode=mode))
+
+
+
+def all_pairs(g, method='johnson', path=None, dtype=np.float64, workers=None):
+    '''
+    Calcula os caminhos mínimos entre todos os pares de vértices e os guarda em um
+    APSP
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (np.matrix, dicionário ou CSR): grafo reprasentado por uma matriz de
+        adjacência com pesos, uma lista de adjacência ou no formato CSR
+        - method (string): 'johnson' ou 'floyd_warshall'
+        - path (string): se dado, as matrizes são gravadas em disco (APSP.save) e
+        o resultado é aberto com numpy.memmap. Com johnson, cada linha é gravada
+        assim que calculada, sem guardar as matrizes na memória
+        - dtype (np.dtype): tipo das distâncias (np.float64 ou np.float32)
+        - workers (int): número de processos usados por johnson
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - r (APSP): caminhos mínimos entre todos os pares (None caso o grafo tenha
+        um ciclo negativo)
+    '''
+    if method == 'floyd_warshall':
+        d, prev = floyd_warshall(g, dtype)
+        if d is None:
+            return None
+        r = APSP(d, prev)
+        if path:
+            r.save(path)
+            r = load_apsp(path)
+        return r
+
+    rows = johnson(g, workers, stream=True)
+    if isinstance(rows, list):
+        return None
+    n = len(_to_csr(g))
+    if path:
+        d = np.lib.format.open_memmap(path + '.dist.npy', mode='w+', dtype=dtype, shape=(n, n))
+        prev = np.lib.format.open_memmap(path + '.prev.npy', mode='w+', dtype=_index_dtype(n), shape=(n, n))
+    else:
+        d = np.empty((n, n), dtype=dtype)
+        prev = np.empty((n, n), dtype=_index_dtype(n))
+    for s, dist, parents in rows:
+        d[s-1] = dist
+        prev[s-1] = parents
+    if path:
+        d.flush()
+        prev.flush()
+        del d, prev
+        return load_apsp(path)
+    return APSP(d, prev)
+
+
+
 def minimal_path(v, u, prev):
     '''
     A partir da lista prev retornada pelo algoritmo de Floyd-Warshall retorna o 
@@ -863,85 +3168,132 @@ def minimal_path(v, u, prev):
     v = v-1
     u = u-1
     while u != v:
-        u = prev.item((v, u))
+        u = int(prev[v, u])
         if u == -1:
             return 'Não existe caminho de ' + str(v+1) + ' até ' + str(end) 
-        path.insert(0, u+1)
+        path.append(u+1)
+    path.reverse()
     return path
 
         
     
-def prim_mst(g, v_1):
+def prim_mst(g, v_1=1):
+    '''
+    Calcula a árvore geradora mínima do grafo com o algoritmo de Prim, usando uma
+    fila de prioridade indexada (indexedheap) com diminuição de chave, em
+    O(m log n). Em grafos desconexos retorna a floresta geradora mínima: quando
+    a componente de v_1 termina, a busca recomeça no menor vértice ainda fora da
+    floresta
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (np.matrix, dicionário ou CSR): grafo não direcionado reprasentado por
+        uma matriz de adjacência com pesos (inf onde não há aresta), uma lista de
+        adjacência ou no formato CSR
+        - v_1 (int): vértice inicial
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - list_mst (list): arestas [pai, vértice, peso] na ordem em que entraram
+        na árvore
+    '''
+    nbrs = _weighted_neighbors(g)
+    n = _num_vertices(g)
+    INF = float('inf')
+    key = [INF] * n # Menor peso de uma aresta ligando cada vértice à árvore
+    parent = [-1] * n
+    done = bytearray(n)
+    heap = indexedheap(n)
+    list_mst = []
+
+    for root in [v_1 - 1] + list(range(n)):
+        if done[root]:
+            continue
+        key[root] = 0.0
+        heap[root] = 0.0
+        while heap:
+            u = heap.popitem()[0]
+            done[u] = 1
+            if parent[u] != -1:
+                list_mst.append([parent[u] + 1, u + 1, key[u]])
+            for v, w in nbrs(u):
+                if not done[v] and w < key[v]:
+                    key[v] = w
+                    parent[v] = u
+                    heap.decrease_key(v, w)
 
-    v_n = len(g) # número de vértices do grafo
-    v_1 = v_1 - 1 
+    return list_mst
 
 
-    
-    if isinstance(g, list):
 
-        infinity = float('inf')
-        selected_node = [0] * len(g)
-        selected_node[v_1] = True
-        num_edge = 0
-        list_mst = []
-
-        #print("Edge : weight \n")
-        while(num_edge < (v_n - 1)):
-            min = infinity
-            a=0
-            b=0
-            for m in range(v_n):
-                if selected_node[m]:
-                    for n in range(v_n):
-                        if((not selected_node[n] and g[m][n])):
-                            if(min > g[m][n]):
-                                min = g[m][n]
-                                a=m
-                                b=n
-            
-            #print(str(a) + "-" + str(b)+": "+ str(g[a][b]))
-            list_mst.append([a+1,b+1,g[a][b]])
-            selected_node[b] = True
-            num_edge += 1
-
-        return list_mst
+def kruskal_mst(g):
+    '''
+    Calcula a floresta geradora mínima do grafo com o algoritmo de Kruskal: as
+    arestas são ordenadas pelo peso e adicionadas quando ligam duas componentes
+    diferentes da estrutura union-find, em O(m log m)
+    ------------------------------------------------------------------------------
+    ENTRADA:
+        - g (np.matrix, dicionário ou CSR): grafo não direcionado reprasentado por
+        uma matriz de adjacência com pesos (inf onde não há aresta), uma lista de
+        adjacência ou no formato CSR
+    ------------------------------------------------------------------------------
+    SAÍDA:
+        - list_mst (list): arestas [u, v, peso] (com u < v) em ordem crescente de
+        peso
+    '''
+    h = _unwrap(g)
+    if isinstance(h, (dict, CSR)) or (isinstance(h, list) and h and isinstance(h[0], bitarray)):
+        c, src, dst, w = _edge_arrays(g)
+    else:
+        # Matriz de pesos (np.matrix ou lista de listas), com inf onde não há aresta
+        m = np.asarray(h, dtype=np.float64)
+        src, dst = np.nonzero(np.isfinite(m))
+        w = m[src, dst]
+    n = _num_vertices(g)
+
+    # Cada aresta é vista nos dois sentidos; ficamos com u < v (sem laços)
+    keep = src < dst
+    src, dst, w = src[keep], dst[keep], w[keep]
+    order = np.argsort(w, kind='stable')
+
+    uf = UnionFind(n)
+    list_mst = []
+    for u, v, x in zip(src[order].tolist(), dst[order].tolist(), w[order].tolist()):
+        if uf.union(u + 1, v + 1):
+            list_mst.append([u + 1, v + 1, x])
+            if uf.count == 1:
+                break
+    return list_mst
+
+
 
 def totalWeight(edges_mst):
-    n=len(edges_mst)
-    sum_weight = 0
-    for i in range(n):
-        sum_weight += edges_mst[i][2]
+    '''
+    Soma dos pesos das arestas retornadas por prim_mst ou kruskal_mst
+    '''
+    return sum(e[2] for e in edges_mst)
 
-    return sum_weight
 
-def out_graph_mst(g, path, v_1):
+
+def out_graph_mst(g, path, v_1=1, method='prim'):
     """
-    Cria um novo arquivo texto contendo informações sobre o grafo
+    Cria um novo arquivo texto contendo a árvore (ou floresta) geradora mínima do
+    grafo
     ------------------------------------------------------------------------------
     ENTRADA:
-        - g é uma lista: grafo reprasentado por uma matriz de adjacência 
-        
+        - g (np.matrix, dicionário ou CSR): grafo não direcionado reprasentado por
+        uma matriz de adjacência com pesos, uma lista de adjacência ou no formato
+        CSR
         - path (string): caminho que será usado para criar o arquivo texto
+        - v_1 (int): vértice inicial (usado por prim_mst)
+        - method (string): 'prim' ou 'kruskal'
     """
-
-    #preciso de uma lista com as arestas da MST
-
-    prim_result = prim_mst(g, v_1)
+    if method == 'kruskal':
+        edges_mst = kruskal_mst(g)
+    else:
+        edges_mst = prim_mst(g, v_1)
 
     with open(path, 'w') as f:
+        f.write("Total vértices : " + str(_num_vertices(g)) + '\n')
+        f.write("Peso total: " + str(totalWeight(edges_mst)) + '\n')
 
-        f.write("Total vértices : " + str(len(g)) + '\n')
-
-    
-        f.write("Peso total: " + str(totalWeight(prim_result))+'\n')
-
-        
-
-        for arestas in prim_result:
+        for arestas in edges_mst:
             f.write(str(arestas[0]) + ' ' + str(arestas[1]) + ' ' + str(arestas[2]) + '\n')
-
-
-
-        
-
@@ -0,0 +1,777 @@
+"""
+Benchmarks das funções de Graph_Functions.py
+
+Uso:
+    python benchmarks.py read_graph [n_arestas]
+    python benchmarks.py degrees [n_arestas]
+    python benchmarks.py bfs [n_arestas]
+    python benchmarks.py directed
+    python benchmarks.py all_sources [n_arestas] [n_origens]
+    python benchmarks.py dijkstra [n_arestas]
+    python benchmarks.py dijkstra_many [n_arestas] [n_origens]
+    python benchmarks.py shortest_path [lado_da_grade] [n_consultas]
+    python benchmarks.py astar [lado_da_grade] [n_consultas]
+    python benchmarks.py landmarks [lado_da_grade] [n_consultas] [n_marcos]
+    python benchmarks.py floyd_warshall [n_vértices]
+    python benchmarks.py johnson [n_vértices]
+    python benchmarks.py bellman_ford [n_arestas]
+    python benchmarks.py apsp [n_vértices] [n_consultas]
+    python benchmarks.py mst [n_arestas]
+"""
+import os
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from bitarray import bitarray
+import numpy as np
+from heapdict import heapdict, indexedheap
+
+from Graph_Functions import read_graph, BFS, _bfs_hybrid, all_sources_bfs, dijkstra, shortest_path, CSR
+from Graph_Functions import Graph, degrees, num_edges, eccentricities, diameter
+from Graph_Functions import dijkstra_many, floyd_warshall, johnson, bellman_ford, all_pairs
+from Graph_Functions import read_coords, euclidean, landmark_heuristic, astar, landmarks, load_landmarks
+from Graph_Functions import prim_mst, kruskal_mst, totalWeight
+
+
+def _time(f, *args, **kw):
+    '''
+    Executa f(*args, **kw) e retorna o resultado e o tempo gasto (s)
+    '''
+    t = time.perf_counter()
+    result = f(*args, **kw)
+    return result, time.perf_counter() - t
+
+
+
+def _measure(f, *args, **kw):
+    '''
+    Executa f(*args, **kw) e retorna o resultado, o tempo gasto (s) e o pico de
+    memória alocada (MB) durante a execução
+    '''
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = f(*args, **kw)
+    t = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, t, peak
+
+
+
+def synthetic_graph(path, n, m, weight=False, seed=0):
+    '''
+    Escreve em path um grafo aleatório com n vértices e m arestas no mesmo
+    formato dos arquivos em Grafos/
+    '''
+    rng = np.random.default_rng(seed)
+    with open(path, 'w') as f:
+        f.write(str(n) + '\n')
+        # Escrevemos em blocos para não precisar guardar todo o texto na memória
+        for start in range(0, m, 10**6):
+            k = min(10**6, m - start)
+            edges = rng.integers(1, n + 1, size=(k, 2))
+            if weight:
+                w = rng.integers(1, 100, size=(k, 1))
+                np.savetxt(f, np.hstack((edges, w)), fmt='%d')
+            else:
+                np.savetxt(f, edges, fmt='%d')
+
+
+
+def grid_graph(path, k, seed=0, coords=None):
+    '''
+    Escreve em path uma grade k x k com pesos aleatórios (de 1 a 99), parecida com
+    uma malha viária. O vértice da linha i e coluna j é i*k + j + 1, com
+    coordenadas (j, i), que são escritas em coords se dado
+    '''
+    rng = np.random.default_rng(seed)
+    v = np.arange(k * k).reshape(k, k) + 1
+    src = np.concatenate((v[:, :-1].ravel(), v[:-1, :].ravel()))
+    dst = np.concatenate((v[:, 1:].ravel(), v[1:, :].ravel()))
+    w = rng.integers(1, 100, size=len(src))
+    with open(path, 'w') as f:
+        f.write(str(k * k) + '\n')
+        np.savetxt(f, np.column_stack((src, dst, w)), fmt='%d')
+    if coords:
+        with open(coords, 'w') as f:
+            f.write(str(k * k) + '\n')
+            np.savetxt(f, np.column_stack((v.ravel(), (v.ravel() - 1) % k, (v.ravel() - 1) // k)), fmt='%d')
+
+
+
+#---------------------------------------------------------------------------------------------------------------------------------
+#
+## LEITURA DO GRAFO
+
+
+def read_graph_old(path, g_type, weight=False, directed=False):
+    '''
+    Leitor original de read_graph (linha a linha), mantido apenas como referência
+    para os benchmarks
+    '''
+    with open(path, 'r') as f:
+        n = int(f.readline())
+        A = []
+        for line in f:
+            a = line.split(' ')
+            for i in range(2):
+                a[i] = int(a[i])
+            if (weight == True):
+                a[2] = float(a[2])
+            A.append(a)
+
+        if g_type == 'ma':
+            if weight == False:
+                ma = [bitarray([0]*n) for i in range(n)]
+                for a in A:
+                    ma[a[0]-1][a[1]-1] = 1
+                    ma[a[1]-1][a[0]-1] = 1
+                return ma
+            ma_w = np.matrix([[float('inf')]*n]*n, dtype=np.float16)
+            for i in range(n):
+                ma_w[i, i] = 0
+            for a in A:
+                ma_w[a[0]-1, a[1]-1] = a[2]
+                if directed == False:
+                    ma_w[a[1]-1, a[0]-1] = a[2]
+            return ma_w
+
+        if g_type == 'la':
+            la = {}
+            for a in A:
+                if weight == False:
+                    la.setdefault(a[0], set()).add(a[1])
+                    la.setdefault(a[1], set()).add(a[0])
+                else:
+                    la.setdefault(a[0], set()).add((a[1], a[2]))
+                    if directed == False:
+                        la.setdefault(a[1], set()).add((a[0], a[2]))
+            return la
+
+
+
+def bench_read_graph(path, g_types=('la', 'csr'), old=True):
+    '''
+    Compara o tempo e o pico de memória do leitor atual com o leitor original
+    '''
+    print('\n' + path + ' (' + str(round(os.path.getsize(path) / 2**20, 1)) + ' MB)')
+    for g_type in g_types:
+        if old and g_type != 'csr':
+            _, t, peak = _measure(read_graph_old, path, g_type)
+            print('  antigo  %-3s  %8.3f s  %9.1f MB' % (g_type, t, peak))
+        _, t, peak = _measure(read_graph, path, g_type)
+        print('  novo    %-3s  %8.3f s  %9.1f MB' % (g_type, t, peak))
+
+    # Leitura em blocos de 16 MB
+    _, t, peak = _measure(read_graph, path, 'csr', chunk_size=2**24)
+    print('  blocos  csr  %8.3f s  %9.1f MB' % (t, peak))
+
+
+
+#---------------------------------------------------------------------------------------------------------------------------------
+#
+## GRAUS
+
+
+def bench_degrees(path, n, m_edges):
+    '''
+    Confere os graus das representações ma (com pesos), la e csr com o laço
+    original sobre a lista de adjacência (len de cada conjunto), em um grafo com
+    pesos sem arestas repetidas nem laços, e mostra o tempo de degrees e o número
+    de arestas de cada representação
+    '''
+    la = read_graph_old(path, 'la', weight=True)
+    deg_old, t_old = _time(lambda: np.array([len(la.get(v, ())) for v in range(1, n+1)]))
+    print('  antigo  la   %8.4f s  (graus)' % t_old)
+    for g_type in ('ma', 'la', 'csr'):
+        g = read_graph(path, g_type, weight=True)
+        d, t = _time(degrees, g)
+        print('  novo    %-3s  %8.4f s  (mesmos graus: %s, %d arestas)'
+              % (g_type, t, np.array_equal(d, deg_old), num_edges(g)))
+
+    # Grafo direcionado: cada linha do arquivo é uma aresta
+    g = Graph(read_graph(path, 'la', weight=True, directed=True), directed=True)
+    print('  direcionado la: %d arestas (esperado %d)' % (num_edges(g), m_edges))
+
+
+
+#---------------------------------------------------------------------------------------------------------------------------------
+#
+## BUSCA EM LARGURA
+
+
+def bench_bfs(g, v_1=1):
+    '''
+    Compara a BFS top-down com a BFS com otimização de direção, em tempo e em
+    número de arestas verificadas
+    '''
+    _, t_td = _time(BFS, g, v_1)
+    stats = {}
+    (order, _, _), t_hy = _time(_bfs_hybrid, g, v_1, stats=stats)
+
+    # A BFS top-down verifica todas as arestas de todos os vértices alcançados
+    if isinstance(g, dict):
+        edges_td = sum(len(g[v]) for v in order)
+    else:
+        edges_td = int(np.diff(g.indptr)[np.array(order) - 1].sum())
+
+    print('  top-down  %8.3f s  %12d arestas' % (t_td, edges_td))
+    print('  híbrida   %8.3f s  %12d arestas  (%s)' % (t_hy, stats['edges'], ' '.join(stats['steps'])))
+    print('  redução das arestas verificadas: %.1fx' % (edges_td / max(stats['edges'], 1)))
+
+
+
+def check_directed():
+    '''
+    Confere a BFS, as excentricidades e o diâmetro de um pequeno grafo direcionado
+    (1 -> 2 e v -> 1 para v de 3 a 10) em um Graph com lista de adjacência e no
+    formato CSR, com os valores calculados à mão
+    '''
+    la = {1: {2}}
+    la.update({v: {1} for v in range(3, 11)})
+    src = [v - 1 for v in la for u in la[v]]
+    dst = [u - 1 for v in la for u in la[v]]
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(src, minlength=10))))
+    csr = CSR(indptr, np.array(dst, dtype=np.int32), directed=True)
+
+    ecc = [1, 0] + [2] * 8
+    for name, g in (('la', Graph(la, directed=True)), ('csr', csr)):
+        ok = (BFS(g, 1, hybrid=True) == [1, 2] and BFS(g, 3, hybrid=True) == [3, 1, 2]
+              and eccentricities(g) == ecc and diameter(g) == 2)
+        print('  %-3s  BFS, excentricidades e diâmetro corretos: %s' % (name, ok))
+
+
+
+def bench_all_sources(g, sources):
+    '''
+    Mede o tempo das BFS a partir de todos os vértices de sources com 1, 2, 4, ...
+    processos, até o número de núcleos da máquina
+    '''
+    workers = 1
+    t_1 = None
+    while True:
+        (_, diam, _), t = _time(all_sources_bfs, g, workers, sources)
+        t_1 = t_1 or t
+        print('  %3d processos  %8.3f s  (aceleração %.2fx, diâmetro %d)' % (workers, t, t_1 / t, diam))
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+
+#---------------------------------------------------------------------------------------------------------------------------------
+#
+## CAMINHOS MÍNIMOS
+
+
+def dijkstra_old(g, s, queue=heapdict):
+    '''
+    Implementação original de dijkstra (heapdict com todos os vértices e
+    distâncias em float16), mantida apenas como referência para os benchmarks.
+    queue pode ser trocada por indexedheap, que tem a mesma interface
+    '''
+    s = s-1
+    n = len(g)
+    INF = float('inf')
+
+    dist = np.array([INF]*n, dtype=np.float16)
+    dist[s] = 0
+    parents = [-1]*n
+
+    if queue is indexedheap:
+        heap = indexedheap(n, values=dist)
+    else:
+        heap = queue()
+        for i in range(n):
+            heap[i] = INF
+        heap[s] = 0
+
+    if isinstance(g, dict):
+        while heap:
+            u = heap.popitem()[0]
+            if u+1 in g:
+                for v in g[u+1]:
+                    vertex = v[0]-1
+                    if dist[vertex] > dist[u] + v[1] and vertex in heap:
+                        dist[vertex] = dist[u] + v[1]
+                        heap[vertex] = dist[vertex]
+                        parents[vertex] = u
+
+    elif isinstance(g, CSR):
+        indptr, indices, weights = g.indptr, g.indices, g.weights
+        while heap:
+            u = heap.popitem()[0]
+            a, b = indptr[u], indptr[u+1]
+            for vertex, w in zip(indices[a:b].tolist(), weights[a:b].tolist()):
+                if dist[vertex] > dist[u] + w and vertex in heap:
+                    dist[vertex] = dist[u] + w
+                    heap[vertex] = dist[vertex]
+                    parents[vertex] = u
+
+    return [dist, parents]
+
+
+
+def bench_dijkstra(g, s=1):
+    '''
+    Compara o tempo de dijkstra com a implementação original e verifica as
+    distâncias encontradas
+    '''
+    (d_old, _), t_old = _time(dijkstra_old, g, s)
+    _, t_idx = _time(dijkstra_old, g, s, indexedheap)
+    (d_new, _), t_new = _time(dijkstra, g, s)
+    d_old = d_old.astype(np.float64)
+    both = np.isfinite(d_old) & np.isfinite(d_new)
+    err = np.abs(d_old[both] - d_new[both]).max() if both.any() else 0.0
+    print('  antigo (heapdict)     %8.3f s' % t_old)
+    print('  antigo (indexedheap)  %8.3f s' % t_idx)
+    print('  novo (heapq)          %8.3f s  (aceleração %.1fx)' % (t_new, t_old / t_new))
+    print('  maior diferença entre as distâncias: %g' % err)
+    print('  vértices com distância inf apenas no antigo (float16): %d'
+          % np.count_nonzero(np.isinf(d_old) & np.isfinite(d_new)))
+
+
+
+def bench_dijkstra_many(g, sources):
+    '''
+    Mede o tempo de dijkstra_many a partir de todos os vértices de sources com 1,
+    2, 4, ... processos, até o número de núcleos da máquina
+    '''
+    def consume(workers):
+        total = 0.0
+        for s, dist, parents in dijkstra_many(g, sources, workers):
+            total += dist[np.isfinite(dist)].sum()
+        return total
+
+    workers = 1
+    t_1 = None
+    while True:
+        _, t = _time(consume, workers)
+        t_1 = t_1 or t
+        print('  %3d processos  %8.3f s  (aceleração %.2fx)' % (workers, t, t_1 / t))
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count())
+
+
+
+def floyd_warshall_old(g):
+    '''
+    Implementação original de floyd_warshall (laço triplo sobre a np.matrix),
+    mantida apenas como referência para os benchmarks. O alias np.int, que não
+    existe mais no NumPy, foi trocado por int
+    '''
+    n = len(g)
+    INF = float('inf')
+    prev = np.matrix([[-1]*n]*n, dtype=int)
+    d = g.copy()
+
+    for i in range(n):
+        for j in range(n):
+            if i != j and g[i, j] != INF:
+                prev[i, j] = i
+
+    for k in range(n):
+        for i in range(n):
+            if d[i, k] != float('inf'):
+                for j in range(n):
+                    if d[k, j] != float('inf'):
+                        if d[i, j] > d[i, k] + d[k, j]:
+                            if i == j and d[i, k] + d[k, j] < 0:
+                                print('\n-> Grafo contem ciclo negativo <-\n')
+                                return [None, None]
+                            d[i, j] = d[i, k] + d[k, j]
+                            prev[i, j] = prev[k, j]
+
+    return [d, prev]
+
+
+
+def bench_floyd_warshall(n, m, old_n=100, blocks=(128, 256, 512)):
+    '''
+    Compara o laço original de floyd_warshall (em um grafo com old_n vértices) com
+    a versão vetorizada e a versão em blocos, em float64 e float32, em um grafo
+    aleatório direcionado com n vértices e m arestas
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.txt')
+        synthetic_graph(path, old_n, 4 * old_n, weight=True)
+        g = read_graph(path, 'ma', weight=True, directed=True)
+        (d_old, _), t_old = _time(floyd_warshall_old, g)
+        (d_new, _), t_new = _time(floyd_warshall, g)
+        # O laço original mantinha o peso dos laços (v, v) na diagonal
+        d_old = np.asarray(d_old, dtype=np.float64)
+        np.fill_diagonal(d_old, np.minimum(np.diagonal(d_old), 0))
+        print('\n%d vértices' % old_n)
+        print('  antigo       %8.3f s' % t_old)
+        print('  vetorizado   %8.3f s  (aceleração %.0fx, mesmas distâncias: %s)'
+              % (t_new, t_old / t_new, np.array_equal(d_old, d_new)))
+
+        synthetic_graph(path, n, m, weight=True)
+        g = read_graph(path, 'csr', weight=True, directed=True)
+    print('\n%d vértices, %d arestas' % (n, m))
+    for dtype in (np.float64, np.float32):
+        (d, _), t = _time(floyd_warshall, g, dtype)
+        print('  vetorizado          %-7s %8.3f s' % (np.dtype(dtype).name, t))
+        for b in blocks:
+            (d_b, _), t = _time(floyd_warshall, g, dtype, b)
+            print('  blocos de %-4d      %-7s %8.3f s  (mesmas distâncias: %s)'
+                  % (b, np.dtype(dtype).name, t, np.array_equal(d, d_b)))
+
+
+
+def bench_johnson(n, m, workers=None):
+    '''
+    Compara johnson com floyd_warshall em um grafo aleatório direcionado e esparso
+    com n vértices e m arestas, com alguns pesos negativos
+    '''
+    rng = np.random.default_rng(0)
+    edges = rng.integers(1, n + 1, size=(m, 2))
+    w = rng.integers(1, 100, size=m)
+    # Pesos negativos apenas nas arestas de um vértice para um vértice maior, o que
+    # não forma ciclos negativos
+    neg = (edges[:, 0] < edges[:, 1]) & (rng.random(m) < 0.1)
+    w[neg] = -rng.integers(1, 5, size=neg.sum())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.txt')
+        with open(path, 'w') as f:
+            f.write(str(n) + '\n')
+            np.savetxt(f, np.column_stack((edges, w)), fmt='%d')
+        g = read_graph(path, 'csr', weight=True, directed=True)
+
+    print('\n%d vértices, %d arestas (%d com peso negativo)' % (n, m, neg.sum()))
+    (d_fw, _), t_fw = _time(floyd_warshall, g)
+    (d_j, _), t_j = _time(johnson, g, workers)
+    print('  floyd_warshall  %8.3f s' % t_fw)
+    print('  johnson         %8.3f s  (aceleração %.1fx, mesmas distâncias: %s)'
+          % (t_j, t_fw / t_j, np.allclose(d_fw, d_j)))
+
+
+
+def bench_bellman_ford(g, s=1):
+    '''
+    Compara as duas versões de bellman_ford (rodadas vetorizadas e SPFA) com
+    dijkstra em um grafo com pesos não negativos
+    '''
+    stats = {}
+    (d, _), t_d = _time(dijkstra, g, s)
+    (d_bf, _), t_bf = _time(bellman_ford, g, s, False, stats)
+    print('  dijkstra          %8.3f s' % t_d)
+    print('  bellman_ford      %8.3f s  (%d rodadas, mesmas distâncias: %s)'
+          % (t_bf, stats['rounds'], np.array_equal(d, d_bf)))
+    (d_sp, _), t_sp = _time(bellman_ford, g, s, True, stats)
+    print('  bellman_ford spfa %8.3f s  (%d remoções da fila, mesmas distâncias: %s)'
+          % (t_sp, stats['pops'], np.array_equal(d, d_sp)))
+
+
+
+def bench_apsp(g, q, path):
+    '''
+    Mede o armazenamento dos pais de all_pairs (gravados em disco e abertos com
+    memmap) e o tempo de q consultas de caminho, uma a uma e em lote
+    '''
+    n = len(g)
+    r, t = _time(all_pairs, g, 'johnson', path)
+    print('  all_pairs (johnson)  %8.3f s  pais em %s: %.1f MB (%.1f MB em int64)'
+          % (t, r.prev.dtype, r.prev.nbytes / 2**20, n * n * 8 / 2**20))
+
+    rng = np.random.default_rng(0)
+    S, T = rng.integers(1, n + 1, size=(2, q))
+    paths, t_one = _time(lambda: [r.path(s, t) for s, t in zip(S.tolist(), T.tolist())])
+    (flat, offsets), t_batch = _time(r.paths, S, T)
+    print('  %d caminhos um a um  %8.3f s' % (q, t_one))
+    print('  %d caminhos em lote  %8.3f s  (aceleração %.1fx, %d vértices no total)'
+          % (q, t_batch, t_one / t_batch, len(flat)))
+
+
+
+def bench_shortest_path(g, queries):
+    '''
+    Compara, para cada par (s, t) de queries, dijkstra a partir de s com
+    shortest_path com parada antecipada e com a busca bidirecional
+    '''
+    stats = {}
+    for name, f in (('dijkstra', lambda s, t: dijkstra(g, s)),
+                    ('parada antecipada', lambda s, t: shortest_path(g, s, t, stats=stats)),
+                    ('bidirecional', lambda s, t: shortest_path(g, s, t, True, stats))):
+        settled = 0
+        t_total = 0
+        for s, t in queries:
+            stats['settled'] = len(g)
+            _, t_q = _time(f, s, t)
+            t_total += t_q
+            settled += stats['settled']
+        print('  %-18s %8.4f s/consulta  %10.0f vértices definidos/consulta'
+              % (name, t_total / len(queries), settled / len(queries)))
+
+
+
+def bench_astar(g, coords, queries, k=8):
+    '''
+    Compara, para cada par (s, t) de queries, dijkstra com astar usando a
+    heurística euclidiana e a dos marcos (k marcos escolhidos ao acaso)
+    '''
+    rng = np.random.default_rng(2)
+    marks = rng.choice(len(g), size=k, replace=False) + 1
+    h_eu = euclidean(coords)
+    h_lm = landmark_heuristic(np.array([dijkstra(g, int(L))[0] for L in marks]))
+    stats = {}
+    for name, f in (('dijkstra', lambda s, t: dijkstra(g, s)),
+                    ('a* euclidiana', lambda s, t: astar(g, s, t, h_eu, stats)),
+                    ('a* marcos', lambda s, t: astar(g, s, t, h_lm, stats))):
+        settled = 0
+        t_total = 0
+        for s, t in queries:
+            stats['settled'] = len(g)
+            _, t_q = _time(f, s, t)
+            t_total += t_q
+            settled += stats['settled']
+        print('  %-18s %8.4f s/consulta  %10.0f vértices definidos/consulta'
+              % (name, t_total / len(queries), settled / len(queries)))
+
+
+
+def bench_landmarks(g, queries, k=8, path=None):
+    '''
+    Mede o custo do pré-processamento ALT com cada método de escolha dos marcos e
+    a aceleração por consulta, exata (A* com os marcos) e aproximada (menor
+    caminho passando por um marco), em relação a dijkstra
+    '''
+    exact = []
+    t_dij = 0
+    for s, t in queries:
+        (d, _), t_q = _time(dijkstra, g, s)
+        t_dij += t_q
+        exact.append(d[t-1])
+    t_dij /= len(queries)
+    print('  dijkstra  %8.4f s/consulta' % t_dij)
+
+    for method in ('random', 'farthest', 'avoid'):
+        L = landmarks(g, k, method)
+        if path:
+            L.save(path)
+            L, t_load = _time(load_landmarks, path)
+        stats = {}
+        t_alt = settled = 0
+        for s, t in queries:
+            _, t_q = _time(L.query, g, s, t, stats)
+            t_alt += t_q
+            settled += stats['settled']
+        approx, t_apx = _time(lambda: [L.approx(s, t) for s, t in queries])
+        err = np.mean([(a - e) / e for a, e in zip(approx, exact) if e > 0])
+        print('  %-8s  pré-processamento %6.2f s (%d dijkstra)%s'
+              % (method, L.stats['time'], L.stats['dijkstra'],
+                 ', leitura %.3f s' % t_load if path else ''))
+        print('            ALT        %8.4f s/consulta (aceleração %5.1fx, %8.0f vértices definidos)'
+              % (t_alt / len(queries), t_dij * len(queries) / t_alt, settled / len(queries)))
+        print('            aproximada %8.6f s/consulta (aceleração %5.0fx, erro médio %.1f%%)'
+              % (t_apx / len(queries), t_dij * len(queries) / t_apx, 100 * err))
+
+
+
+def prim_mst_old(g, v_1):
+    '''
+    Implementação original de prim_mst (Θ(n³) sobre uma matriz em lista de listas,
+    com 0 indicando ausência de aresta), mantida apenas como referência para os
+    benchmarks
+    '''
+    v_n = len(g)
+    v_1 = v_1 - 1
+    infinity = float('inf')
+    selected_node = [0] * len(g)
+    selected_node[v_1] = True
+    num_edge = 0
+    list_mst = []
+
+    while(num_edge < (v_n - 1)):
+        min = infinity
+        a=0
+        b=0
+        for m in range(v_n):
+            if selected_node[m]:
+                for n in range(v_n):
+                    if((not selected_node[n] and g[m][n])):
+                        if(min > g[m][n]):
+                            min = g[m][n]
+                            a=m
+                            b=n
+        list_mst.append([a+1,b+1,g[a][b]])
+        selected_node[b] = True
+        num_edge += 1
+
+    return list_mst
+
+
+
+def bench_mst(n, m, old_n=150):
+    '''
+    Compara o prim_mst original (em um grafo com old_n vértices) com as versões
+    com fila de prioridade (prim_mst) e union-find (kruskal_mst), e mede as duas
+    em um grafo aleatório com n vértices e m arestas
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'synthetic.txt')
+        # Grafo conexo: um caminho 1-2-...-old_n mais arestas aleatórias
+        synthetic_graph(path, old_n, 4 * old_n, weight=True)
+        with open(path, 'a') as f:
+            for v in range(1, old_n):
+                f.write('%d %d 100\n' % (v, v + 1))
+        g = read_graph(path, 'ma', weight=True)
+        old = np.asarray(g, dtype=np.float64)
+        old[~np.isfinite(old)] = 0
+        old = old.tolist()
+        w_old, t_old = _time(lambda: totalWeight(prim_mst_old(old, 1)))
+        w_new, t_new = _time(lambda: totalWeight(prim_mst(g, 1)))
+        print('\n%d vértices' % old_n)
+        print('  antigo   %8.3f s' % t_old)
+        print('  prim     %8.3f s  (aceleração %.0fx, mesmo peso: %s)'
+              % (t_new, t_old / t_new, w_old == w_new))
+
+        synthetic_graph(path, n, m, weight=True)
+        g = read_graph(path, 'csr', weight=True)
+    print('\n%d vértices, %d arestas (csr)' % (n, m))
+    w_p, t_p = _time(lambda: totalWeight(prim_mst(g, 1)))
+    w_k, t_k = _time(lambda: totalWeight(kruskal_mst(g)))
+    print('  prim     %8.3f s' % t_p)
+    print('  kruskal  %8.3f s  (mesmo peso: %s)' % (t_k, w_p == w_k))
+
+
+
+if __name__ == '__main__':
+    name = sys.argv[1] if len(sys.argv) > 1 else 'read_graph'
+
+    if name == 'read_graph':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**7
+        bench_read_graph('Grafos/grafo_2.txt', ('ma', 'la', 'csr'))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m)
+            bench_read_graph(path)
+
+    elif name == 'degrees':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**5
+        n = m // 10
+        rng = np.random.default_rng(0)
+        # Arestas distintas, sem laços, com pesos de 1 a 99
+        e = rng.integers(1, n + 1, size=(m, 2))
+        e = np.unique(np.sort(e[e[:, 0] != e[:, 1]], axis=1), axis=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            with open(path, 'w') as f:
+                f.write(str(n) + '\n')
+                np.savetxt(f, np.column_stack((e, rng.integers(1, 100, size=len(e)))), fmt='%d')
+            print('\n' + str(n) + ' vértices, ' + str(len(e)) + ' arestas distintas com pesos')
+            bench_degrees(path, n, len(e))
+
+    elif name == 'bfs':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**7
+        for g_type in ('la', 'csr'):
+            print('\nGrafos/grafo_2.txt (' + g_type + ')')
+            bench_bfs(read_graph('Grafos/grafo_2.txt', g_type))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m)
+            print('\n' + str(m) + ' arestas aleatórias (csr)')
+            bench_bfs(read_graph(path, 'csr'))
+
+    elif name == 'directed':
+        print('\ngrafo direcionado 1 -> 2, v -> 1 (v = 3..10)')
+        check_directed()
+
+    elif name == 'all_sources':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**6
+        k = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m)
+            print('\n' + str(m) + ' arestas aleatórias, ' + str(k) + ' origens')
+            bench_all_sources(read_graph(path, 'csr'), range(1, k+1))
+
+    elif name == 'dijkstra':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**5
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m, weight=True)
+            for g_type in ('la', 'csr'):
+                print('\n' + str(m) + ' arestas aleatórias com pesos (' + g_type + ')')
+                bench_dijkstra(read_graph(path, g_type, weight=True))
+
+    elif name == 'dijkstra_many':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**5
+        k = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m, weight=True)
+            print('\n' + str(m) + ' arestas aleatórias com pesos, ' + str(k) + ' origens')
+            bench_dijkstra_many(read_graph(path, 'csr', weight=True), range(1, k+1))
+
+    elif name == 'floyd_warshall':
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        bench_floyd_warshall(n, 10 * n)
+
+    elif name == 'johnson':
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        bench_johnson(n, 3 * n)
+
+    elif name == 'bellman_ford':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**6
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, m // 10, m, weight=True)
+            print('\n' + str(m) + ' arestas aleatórias com pesos (csr)')
+            bench_bellman_ford(read_graph(path, 'csr', weight=True))
+            path = os.path.join(tmp, 'grid.txt')
+            grid_graph(path, 300)
+            print('\ngrade 300x300 com pesos (csr)')
+            bench_bellman_ford(read_graph(path, 'csr', weight=True))
+
+    elif name == 'apsp':
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        q = int(sys.argv[3]) if len(sys.argv) > 3 else 10**5
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'synthetic.txt')
+            synthetic_graph(path, n, 4 * n, weight=True)
+            print('\n' + str(n) + ' vértices, ' + str(4 * n) + ' arestas aleatórias com pesos (csr)')
+            bench_apsp(read_graph(path, 'csr', weight=True, directed=True), q, os.path.join(tmp, 'apsp'))
+
+    elif name == 'shortest_path':
+        k = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        q = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        rng = np.random.default_rng(1)
+        queries = rng.integers(1, k * k + 1, size=(q, 2)).tolist()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.txt')
+            grid_graph(path, k)
+            print('\ngrade ' + str(k) + 'x' + str(k) + ' com pesos (csr)')
+            bench_shortest_path(read_graph(path, 'csr', weight=True), queries)
+
+    elif name == 'astar':
+        k = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        q = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        rng = np.random.default_rng(1)
+        queries = rng.integers(1, k * k + 1, size=(q, 2)).tolist()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.txt')
+            coords = os.path.join(tmp, 'grid.xy')
+            grid_graph(path, k, coords=coords)
+            print('\ngrade ' + str(k) + 'x' + str(k) + ' com pesos (csr)')
+            bench_astar(read_graph(path, 'csr', weight=True), read_coords(coords), queries)
+
+    elif name == 'landmarks':
+        k = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+        q = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+        marks = int(sys.argv[4]) if len(sys.argv) > 4 else 8
+        rng = np.random.default_rng(1)
+        queries = rng.integers(1, k * k + 1, size=(q, 2)).tolist()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'grid.txt')
+            grid_graph(path, k)
+            print('\ngrade ' + str(k) + 'x' + str(k) + ' com pesos (csr), ' + str(marks) + ' marcos')
+            bench_landmarks(read_graph(path, 'csr', weight=True), queries, marks,
+                            os.path.join(tmp, 'grid.npz'))
+
+    elif name == 'mst':
+        m = int(sys.argv[2]) if len(sys.argv) > 2 else 10**6
+        bench_mst(m // 10, m)
@@ -1,3 +1,5 @@
+from array import array
+
 try:
     from collections.abc import MutableMapping
 except ImportError:
@@ -30,7 +32,14 @@ class heapdict(MutableMapping):
     @doc(dict.__setitem__)
     def __setitem__(self, key, value):
         if key in self.d:
-            self.pop(key)
+            # Update the priority in place instead of deleting and reinserting
+            wrapper = self.d[key]
+            old, wrapper[0] = wrapper[0], value
+            if value < old:
+                self._decrease_key(wrapper[2])
+            else:
+                self._min_heapify(wrapper[2])
+            return
         wrapper = [value, key, len(self)]
         self.d[key] = wrapper
         self.heap.append(wrapper)
@@ -111,5 +120,149 @@ class heapdict(MutableMapping):
         return (self.heap[0][1], self.heap[0][0])
 
 
+class indexedheap(MutableMapping):
+    """Array-backed indexed d-ary min-heap over the integer keys 0..n-1.
+
+    The heap holds keys in an array('l'), priorities live in an array('d')
+    indexed by key and pos[key] is the slot of key in the heap (-1 when absent),
+    so membership tests are O(1) and decrease_key sifts the entry up in place in
+    O(log_d n). The mapping API matches heapdict."""
+
+    def __init__(self, n, d=4, values=None):
+        self.n = n
+        self.arity = d
+        self.heap = array('l')
+        self.pos = array('l', [-1]) * n
+        self.vals = array('d', [0.0]) * n
+        if values is not None:
+            self.heapify(values)
+
+    def heapify(self, values):
+        """H.heapify(values) -> None, replace the contents with keys 0..len(values)-1
+and priorities values, building the heap bottom-up in O(n)."""
+        n = len(values)
+        self.vals[:n] = array('d', values)
+        self.heap = array('l', range(n))
+        self.pos[:] = array('l', [-1]) * self.n
+        self.pos[:n] = array('l', range(n))
+        for i in range((n - 2) // self.arity, -1, -1):
+            self._sift_down(i)
+
+    @doc(dict.clear)
+    def clear(self):
+        for key in self.heap:
+            self.pos[key] = -1
+        del self.heap[:]
+
+    def _sift_up(self, i):
+        h, pos, vals, d = self.heap, self.pos, self.vals, self.arity
+        key = h[i]
+        value = vals[key]
+        while i:
+            parent = (i - 1) // d
+            pkey = h[parent]
+            if vals[pkey] <= value:
+                break
+            h[i] = pkey
+            pos[pkey] = i
+            i = parent
+        h[i] = key
+        pos[key] = i
+
+    def _sift_down(self, i):
+        h, pos, vals, d = self.heap, self.pos, self.vals, self.arity
+        n = len(h)
+        key = h[i]
+        value = vals[key]
+        while True:
+            first = i * d + 1
+            if first >= n:
+                break
+            # smallest of the (up to d) children
+            child = first
+            cval = vals[h[first]]
+            for c in range(first + 1, min(first + d, n)):
+                if vals[h[c]] < cval:
+                    child, cval = c, vals[h[c]]
+            if value <= cval:
+                break
+            h[i] = h[child]
+            pos[h[i]] = i
+            i = child
+        h[i] = key
+        pos[key] = i
+
+    def decrease_key(self, key, value):
+        """H.decrease_key(k, v) -> None, lower the priority of k (inserting it if
+absent) to v; v must not be larger than the current priority."""
+        if not 0 <= key < self.n:
+            raise KeyError(key)
+        i = self.pos[key]
+        self.vals[key] = value
+        if i < 0:
+            self.heap.append(key)
+            i = len(self.heap) - 1
+        self._sift_up(i)
+
+    @doc(dict.__setitem__)
+    def __setitem__(self, key, value):
+        if not 0 <= key < self.n:
+            raise KeyError(key)
+        i = self.pos[key]
+        if i < 0 or value < self.vals[key]:
+            self.decrease_key(key, value)
+        else:
+            self.vals[key] = value
+            self._sift_down(i)
+
+    @doc(dict.__delitem__)
+    def __delitem__(self, key):
+        if not 0 <= key < self.n or self.pos[key] < 0:
+            raise KeyError(key)
+        i = self.pos[key]
+        last = self.heap.pop()
+        self.pos[key] = -1
+        if last != key:
+            self.heap[i] = last
+            self.pos[last] = i
+            self._sift_up(i)
+            self._sift_down(self.pos[last])
+
+    @doc(dict.__getitem__)
+    def __getitem__(self, key):
+        if not 0 <= key < self.n or self.pos[key] < 0:
+            raise KeyError(key)
+        return self.vals[key]
+
+    def __contains__(self, key):
+        return 0 <= key < self.n and self.pos[key] >= 0
+
+    @doc(dict.__iter__)
+    def __iter__(self):
+        return iter(self.heap.tolist())
+
+    def popitem(self):
+        """D.popitem() -> (k, v), remove and return the (key, value) pair with lowest\nvalue; but raise KeyError if D is empty."""
+        if not self.heap:
+            raise KeyError('popitem(): heap is empty')
+        key = self.heap[0]
+        last = self.heap.pop()
+        self.pos[key] = -1
+        if self.heap:
+            self.heap[0] = last
+            self._sift_down(0)
+        return key, self.vals[key]
+
+    @doc(dict.__len__)
+    def __len__(self):
+        return len(self.heap)
+
+    def peekitem(self):
+        """D.peekitem() -> (k, v), return the (key, value) pair with lowest value;\n but raise KeyError if D is empty."""
+        if not self.heap:
+            raise KeyError('peekitem(): heap is empty')
+        return self.heap[0], self.vals[self.heap[0]]
+
+
 del doc
-__all__ = ['heapdict']
+__all__ = ['heapdict', 'indexedheap']